@@ -13,4 +13,19 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "_config.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up.
+from actions.views.catalogue_events_view import (  # noqa: E402
+    CATALOGUE_EVENTS_PATH,
+    catalogue_events_app,
+)
+
+
+async def application(scope, receive, send):
+    """Route the catalogue event streams to their own ASGI application."""
+    if scope["type"] == "http":
+        path = scope["path"].removeprefix(scope.get("root_path", ""))
+        if path == CATALOGUE_EVENTS_PATH:
+            return await catalogue_events_app(scope, receive, send)
+    return await django_application(scope, receive, send)
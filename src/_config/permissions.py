@@ -8,6 +8,8 @@ from rest_framework.exceptions import AuthenticationFailed
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from _config.services.storage_utils.presigned_url import read_local_file_token
+
 User = get_user_model()
 
 class IsOwner(BasePermission):
@@ -32,20 +34,20 @@ class IsFileAuthenticated(BasePermission):
             raise AuthenticationFailed("Missing token")
 
         try:
-            data = signing.loads(token, salt="local-file-token")
+            data = read_local_file_token(token)
         except signing.BadSignature:
             raise AuthenticationFailed("Invalid token")
 
         if timezone.now().timestamp() > data["exp"]:
             raise AuthenticationFailed("Token expired")
 
-        user_id = data.get("user")
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            raise AuthenticationFailed("User not found")
+        # Shared file tokens are not bound to a user.
+        if "user" in data:
+            try:
+                request.user = User.objects.get(id=data["user"])
+            except User.DoesNotExist:
+                raise AuthenticationFailed("User not found")
 
-        request.user = user
         request.file_key = data["file"]
 
         return True
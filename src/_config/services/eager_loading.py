@@ -0,0 +1,100 @@
+from django.db.models import Prefetch, QuerySet, prefetch_related_objects
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+
+
+class EagerLoadingMixin:
+    """Serializer mixin declaring the relations read to serialize instances.
+
+    ``select_related`` and ``prefetch_related`` list the lookups needed by
+    the serializer itself. Those of nested serializers using this mixin are
+    added automatically, so relations are loaded with a constant number of
+    queries wherever the serializer is used. Lists are loaded by
+    ``EagerLoadingListSerializer``.
+    """
+
+    select_related = ()
+    prefetch_related = ()
+
+    @classmethod
+    def get_related_lookups(cls) -> tuple[list, list]:
+        """Return the select_related and prefetch_related lookups needed to
+        serialize instances, nested serializers included.
+        """
+        select = list(cls.select_related)
+        prefetch = {
+            _get_lookup_path(lookup): lookup for lookup in cls.prefetch_related
+        }
+        for name, field in cls._declared_fields.items():
+            many = isinstance(field, serializers.ListSerializer)
+            child = field.child if many else field
+            if not isinstance(child, EagerLoadingMixin):
+                continue
+            source = (field.source or name).replace(".", "__")
+            if many:
+                related_model = child.Meta.model
+                prefetch[source] = Prefetch(
+                    source,
+                    queryset=type(child).setup_eager_loading(
+                        related_model._default_manager.all()
+                    ),
+                )
+                continue
+            child_select, child_prefetch = type(child).get_related_lookups()
+            select.append(source)
+            select.extend(f"{source}__{lookup}" for lookup in child_select)
+            for lookup in child_prefetch:
+                lookup = _prefix_lookup(source, lookup)
+                prefetch[_get_lookup_path(lookup)] = lookup
+        return select, list(prefetch.values())
+
+    @classmethod
+    def setup_eager_loading(cls, queryset: QuerySet) -> QuerySet:
+        """Return the queryset loading the relations of the serializer."""
+        select, prefetch = cls.get_related_lookups()
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+    @classmethod
+    def load_related(cls, instances) -> list:
+        """Load the relations of the serializer on already fetched instances.
+
+        Relations already loaded are not fetched again.
+        """
+        instances = list(instances)
+        select, prefetch = cls.get_related_lookups()
+        prefetch_related_objects(instances, *select, *prefetch)
+        return instances
+
+
+class EagerLoadingListSerializer(serializers.ListSerializer):
+    """List serializer loading the relations of its child in bulk."""
+
+    def to_representation(self, data):
+        return super().to_representation(self.load_related(data))
+
+    def load_related(self, data):
+        """Return the instances to serialize with their relations loaded."""
+        if isinstance(data, BaseManager):
+            data = data.all()
+        child_class = type(self.child)
+        if isinstance(data, QuerySet) and data._result_cache is None:
+            return child_class.setup_eager_loading(data)
+        return child_class.load_related(data)
+
+
+def _get_lookup_path(lookup) -> str:
+    return lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+
+
+def _prefix_lookup(prefix: str, lookup):
+    if isinstance(lookup, Prefetch):
+        return Prefetch(
+            f"{prefix}__{lookup.prefetch_through}",
+            queryset=lookup.queryset,
+            to_attr=lookup.to_attr,
+        )
+    return f"{prefix}__{lookup}"
@@ -0,0 +1,541 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from multiprocessing import get_context
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+from rest_framework.exceptions import ValidationError
+
+from .storage_utils.presigned_url import (
+    generate_presigned_upload_url,
+    get_stored_file_info,
+)
+
+logger = logging.getLogger(__name__)
+
+VERTICAL_CENTERING = {"top": 0, "middle": 0.5, "bottom": 1}
+HORIZONTAL_CENTERING = {"left": 0, "center": 0.5, "right": 1}
+# Image formats and extensions, by content type, of direct uploads.
+UPLOAD_IMAGE_TYPES = {
+    "image/png": ("PNG", "png"),
+    "image/jpeg": ("JPEG", "jpg"),
+    "image/gif": ("GIF", "gif"),
+}
+IMAGE_UPLOAD_TOKEN_SALT = "image-upload"
+# Names of raw uploads start with it, until they are processed.
+RAW_IMAGE_PREFIX = "raw-"
+
+# Sent by the model of records whose image was switched from its raw
+# upload, with ``field_name``, the ``pks`` of the records and the processed
+# ``key``, None if processing failed and the image was removed.
+image_upload_processed = Signal()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def save_image_upload(instance, field_name: str, uploaded_file, attach=True):
+    """Store an uploaded image as is and process it in the background.
+
+    The image is resized and converted as declared by the
+    ``ResizedImageField`` of the record field, by a pool of
+    ``IMAGE_PROCESSING_WORKERS`` processes, or inline when it is 0. When
+    ``attach``, the record is saved with the raw image first; records
+    referencing the raw image are switched to the processed one once it
+    is ready, or cleared if processing fails. Return the key to reference
+    the image with.
+    """
+    field = instance._meta.get_field(field_name)
+    raw_key = default_storage.save(
+        get_raw_image_key(instance, field, uploaded_file.name), uploaded_file
+    )
+    return process_image_upload(instance, field_name, raw_key, attach)
+
+
+def process_image_upload(instance, field_name: str, raw_key: str, attach=True):
+    """Process a raw image already in storage, see ``save_image_upload``."""
+    field = instance._meta.get_field(field_name)
+    if attach:
+        setattr(instance, field_name, raw_key)
+        instance.save()
+    job = (instance._meta.label, field_name, raw_key, get_image_spec(field))
+    if settings.IMAGE_PROCESSING_WORKERS <= 0:
+        try:
+            processed_key = process_image(raw_key, job[3])
+        except Exception:
+            logger.exception("Processing of image %s failed.", raw_key)
+            _discard_failed_image(*job[:3], instance)
+            raise ValidationError({field_name: "Invalid image file."})
+        if attach:
+            _switch_to_processed_image(*job[:3], processed_key, instance)
+        else:
+            default_storage.delete(raw_key)
+        return processed_key
+    transaction.on_commit(lambda: _submit(job))
+    return raw_key
+
+
+def create_image_upload(
+    instance, field_name: str, content_type: str, max_size: int, request
+) -> dict:
+    """Return how to upload an image for a record directly to storage.
+
+    The client PUTs the image to ``upload_url`` with ``headers``, then
+    calls ``finalize_image_upload`` with ``token``.
+    """
+    if content_type not in UPLOAD_IMAGE_TYPES:
+        raise ValidationError(
+            {
+                "content_type": (
+                    f"Must be one of {', '.join(UPLOAD_IMAGE_TYPES)}."
+                )
+            }
+        )
+    field = instance._meta.get_field(field_name)
+    raw_key = get_raw_image_key(
+        instance, field, f"upload.{UPLOAD_IMAGE_TYPES[content_type][1]}"
+    )
+    token = signing.dumps(
+        {
+            "file": raw_key,
+            "model": instance._meta.label,
+            "pk": instance.pk,
+            "field": field_name,
+            "max": max_size,
+        },
+        salt=IMAGE_UPLOAD_TOKEN_SALT,
+    )
+    return {
+        "upload_url": generate_presigned_upload_url(
+            raw_key, content_type, request, max_size
+        ),
+        "method": "PUT",
+        "headers": {"Content-Type": content_type},
+        "token": token,
+        "expires_in": settings.PRESIGNED_URL_EXPIRES_IN,
+    }
+
+
+def finalize_image_upload(instance, field_name: str, token: str, attach=True):
+    """Check an image uploaded directly to storage and process it.
+
+    The stored size, type and image format must match what was allowed
+    by ``create_image_upload``, otherwise the file is deleted. Return the
+    key to reference the image with, see ``save_image_upload``.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        data = signing.loads(
+            token or "",
+            salt=IMAGE_UPLOAD_TOKEN_SALT,
+            # Unfinalized uploads are kept until collected.
+            max_age=settings.ORPHANED_UPLOADS_GRACE_HOURS * 3600,
+        )
+    except signing.BadSignature:
+        raise ValidationError({"token": "Invalid or expired upload token."})
+    if (data["model"], data["pk"], data["field"]) != (
+        instance._meta.label,
+        instance.pk,
+        field_name,
+    ):
+        raise ValidationError({"token": "Upload token of another record."})
+
+    raw_key = data["file"]
+    try:
+        size, content_type = get_stored_file_info(raw_key)
+    except FileNotFoundError:
+        raise ValidationError({"token": "File not uploaded."})
+    expected_type = mimetypes.guess_type(raw_key)[0]
+    if size > data["max"]:
+        error = f"Image size must be less than {data['max'] // 2**20}Mo."
+    elif content_type != expected_type:
+        error = f"Content type must be {expected_type}."
+    else:
+        try:
+            with default_storage.open(raw_key, "rb") as raw_file:
+                image_format = Image.open(raw_file).format
+        except UnidentifiedImageError:
+            image_format = None
+        error = (
+            None
+            if image_format == UPLOAD_IMAGE_TYPES[expected_type][0]
+            else "Invalid image file."
+        )
+    if error:
+        default_storage.delete(raw_key)
+        raise ValidationError({"token": error})
+    return process_image_upload(instance, field_name, raw_key, attach)
+
+
+def get_processed_image_key(instance, field_name: str, key: str) -> str:
+    """Return the key of the processed version of an image, once ready.
+
+    Otherwise, the raw key is returned and checked again once the record
+    is committed with it: processing may have completed meanwhile, before
+    any record referenced the raw image.
+    """
+    field = instance._meta.get_field(field_name)
+    if not field.force_format:
+        return key
+    processed_key = _get_processed_key(key, field.force_format)
+    if default_storage.exists(processed_key):
+        return processed_key
+    transaction.on_commit(
+        lambda: _reconcile_raw_image(instance, field_name, key, processed_key)
+    )
+    return key
+
+
+def get_raw_image_key(instance, field, filename: str) -> str:
+    """Return a key for a raw upload, next to where it is processed."""
+    key = field.generate_filename(instance, filename)
+    directory = os.path.dirname(key)
+    extension = os.path.splitext(filename)[1].lower()
+    return f"{directory}/{RAW_IMAGE_PREFIX}{uuid.uuid4().hex}{extension}"
+
+
+def is_raw_image_key(key: str) -> bool:
+    """Tell whether a key is the one of an image not processed yet.
+
+    Raw images are replaced once processed: they must not be cached as
+    immutable.
+    """
+    return os.path.basename(key).startswith(RAW_IMAGE_PREFIX)
+
+
+def get_image_spec(field) -> dict:
+    """Return the processing options of a ``ResizedImageField``."""
+    return {
+        "size": field.size,
+        "crop": field.crop,
+        "scale": field.scale,
+        "format": field.force_format,
+        "quality": field.quality,
+        "keep_meta": field.keep_meta,
+    }
+
+
+def process_image(raw_key: str, spec: dict) -> str:
+    """Resize and convert a stored image, return the processed key.
+
+    Processing matches what ``ResizedImageField`` does on save.
+    """
+    from django_resized.forms import (
+        convert_mode_for_format,
+        normalize_rotation,
+    )
+    from PIL import Image, ImageFile, ImageOps
+
+    with default_storage.open(raw_key, "rb") as raw_file:
+        image = Image.open(BytesIO(raw_file.read()))
+    image = normalize_rotation(image)
+    image_format = spec["format"] or image.format
+    if spec["format"]:
+        image = convert_mode_for_format(spec["format"], image)
+    size = spec["size"] or image.size
+    scale = spec["scale"]
+    resample = Image.Resampling.LANCZOS
+    if spec["crop"]:
+        vertical, horizontal = spec["crop"]
+        processed = ImageOps.fit(
+            image,
+            size,
+            resample,
+            centering=(
+                VERTICAL_CENTERING[vertical],
+                HORIZONTAL_CENTERING[horizontal],
+            ),
+        )
+    elif None in size:
+        processed = image
+        if size[0] is not None:
+            scale = size[0] / image.size[0]
+        elif size[1] is not None:
+            scale = size[1] / image.size[1]
+    else:
+        image.thumbnail(size, resample)
+        processed = image
+    if scale is not None:
+        processed = ImageOps.scale(processed, scale, resample)
+
+    info = dict(image.info)
+    if not spec["keep_meta"]:
+        info.pop("exif", None)
+    ImageFile.MAXBLOCK = max(
+        ImageFile.MAXBLOCK, processed.size[0] * processed.size[1]
+    )
+    content = BytesIO()
+    processed.save(
+        content, format=image_format, quality=spec["quality"], **info
+    )
+    processed_key = default_storage.save(
+        _get_processed_key(raw_key, image_format),
+        ContentFile(content.getvalue()),
+    )
+    _save_derivatives(processed_key, processed, image_format)
+    return processed_key
+
+
+def get_derivative_key(key: str, image_format: str, width=None) -> str:
+    """Return the key of a derivative of a processed image."""
+    stem = os.path.splitext(key)[0]
+    suffix = f"-{width}" if width else ""
+    return f"{stem}{suffix}.{_get_extension(image_format)}"
+
+
+def get_image_variant_key(request, key: str) -> str:
+    """Return the key of the variant of an image a request asks for.
+
+    The ``image_format`` and ``width`` query params select a derivative,
+    the ``Accept`` header its format otherwise, ``format`` being used by
+    the API for renderers. The smallest derivative at
+    least as wide as asked is used, the image itself if none exists.
+    """
+    formats = get_derivative_formats()
+    image_format = request.GET.get("image_format", "").upper()
+    if image_format == "JPG":
+        image_format = "JPEG"
+    if image_format not in formats:
+        accept = request.META.get("HTTP_ACCEPT", "")
+        image_format = next(
+            (
+                derivative_format
+                for derivative_format in formats
+                if f"image/{derivative_format.lower()}" in accept
+            ),
+            None,
+        )
+    try:
+        width = int(request.GET.get("width", ""))
+    except ValueError:
+        width = None
+    if image_format is None and width is None:
+        return key
+
+    extension = os.path.splitext(key)[1]
+    if image_format is None or _get_extension(image_format) == extension[1:]:
+        image_format = None
+    candidates = [
+        get_derivative_key(key, image_format or extension[1:], derivative)
+        for derivative in sorted(settings.IMAGE_DERIVATIVE_WIDTHS)
+        if width is not None and derivative >= width
+    ]
+    if image_format is not None:
+        candidates.append(get_derivative_key(key, image_format))
+    for candidate in candidates:
+        if default_storage.exists(candidate):
+            return candidate
+    return key
+
+
+def get_derivative_formats() -> list:
+    """Return the derivative formats, by preference, Pillow can write."""
+    from PIL import Image
+
+    Image.init()
+    return [
+        image_format
+        for image_format in settings.IMAGE_DERIVATIVE_FORMATS
+        if image_format in Image.SAVE
+    ]
+
+
+def _save_derivatives(processed_key: str, image, image_format: str) -> None:
+    """Save the processed image in the derivative formats, and smaller
+    widths of every format.
+    """
+    from PIL import Image
+
+    widths = [None] + [
+        width
+        for width in sorted(settings.IMAGE_DERIVATIVE_WIDTHS)
+        if width < image.width
+    ]
+    for derivative_format in [image_format, *get_derivative_formats()]:
+        for width in widths:
+            if width is None and derivative_format == image_format:
+                continue
+            derivative = image
+            if width is not None:
+                derivative = image.resize(
+                    (width, round(image.height * width / image.width)),
+                    Image.Resampling.LANCZOS,
+                )
+            if derivative_format == "JPEG" and derivative.mode != "RGB":
+                derivative = derivative.convert("RGB")
+            content = BytesIO()
+            derivative.save(
+                content,
+                format=derivative_format,
+                quality=settings.IMAGE_DERIVATIVE_QUALITY,
+            )
+            default_storage.save(
+                get_derivative_key(processed_key, derivative_format, width),
+                ContentFile(content.getvalue()),
+            )
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned workers do not share connections with the process.
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_PROCESSING_WORKERS,
+                mp_context=get_context("spawn"),
+                initializer=django.setup,
+            )
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Forget a broken executor, so that the next job starts a new one."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def _submit(job, retry=True) -> None:
+    model_label, field_name, raw_key, spec = job
+    executor = _get_executor()
+    try:
+        future = executor.submit(process_image, raw_key, spec)
+    except BrokenProcessPool:
+        # A worker died, e.g. killed for lack of memory.
+        _discard_executor(executor)
+        future = _get_executor().submit(process_image, raw_key, spec)
+
+    def on_done(future):
+        try:
+            processed_key = future.result()
+        except BrokenProcessPool:
+            _discard_executor(executor)
+            if retry:
+                # The job may not be the one that broke the pool.
+                _submit(job, retry=False)
+                return
+            processed_key = None
+            logger.exception("Processing of image %s failed.", raw_key)
+        except Exception:
+            processed_key = None
+            logger.exception("Processing of image %s failed.", raw_key)
+        close_old_connections()
+        try:
+            if processed_key is None:
+                _discard_failed_image(model_label, field_name, raw_key)
+            else:
+                _switch_to_processed_image(
+                    model_label, field_name, raw_key, processed_key
+                )
+        except Exception:
+            logger.exception("Switching from image %s failed.", raw_key)
+        finally:
+            close_old_connections()
+
+    future.add_done_callback(on_done)
+
+
+def _reconcile_raw_image(instance, field_name, raw_key, processed_key):
+    """Switch or clear a raw image committed after it was processed."""
+    if default_storage.exists(processed_key):
+        _switch_to_processed_image(
+            instance._meta.label, field_name, raw_key, processed_key, instance
+        )
+    elif not default_storage.exists(raw_key):
+        # Processing failed and the raw image was deleted.
+        _discard_failed_image(
+            instance._meta.label, field_name, raw_key, instance
+        )
+
+
+def _switch_to_processed_image(
+    model_label, field_name, raw_key, processed_key, instance=None
+) -> None:
+    """Point the records using a raw image, and their history, to its
+    processed version.
+
+    Records are updated without being saved: the switch is not an edition.
+    The raw image is deleted if records were switched. Otherwise, it may
+    still be referenced later, see ``get_processed_image_key``, and is left
+    in storage until unreferenced uploads are cleaned up.
+    """
+    switched = _replace_image(model_label, field_name, raw_key, processed_key)
+    if instance is not None and getattr(instance, field_name).name == raw_key:
+        setattr(instance, field_name, processed_key)
+    if switched:
+        transaction.on_commit(lambda: default_storage.delete(raw_key))
+
+
+def _discard_failed_image(
+    model_label, field_name, raw_key, instance=None
+) -> None:
+    """Clear the records using a raw image that could not be processed,
+    and delete it.
+    """
+    _replace_image(model_label, field_name, raw_key, None)
+    if instance is not None and getattr(instance, field_name).name == raw_key:
+        setattr(instance, field_name, None)
+    transaction.on_commit(lambda: default_storage.delete(raw_key))
+
+
+def _replace_image(model_label, field_name, raw_key, key) -> bool:
+    """Replace a raw image in records and their history, return whether
+    any row referenced it.
+    """
+    model = apps.get_model(model_label)
+    with transaction.atomic():
+        pks = list(
+            model._default_manager.select_for_update()
+            .filter(**{field_name: raw_key})
+            .values_list("pk", flat=True)
+        )
+        if pks:
+            _set_image(
+                model._default_manager.filter(pk__in=pks), field_name, key
+            )
+            image_upload_processed.send(
+                sender=model, field_name=field_name, pks=pks, key=key
+            )
+        history_attribute = getattr(
+            model._meta, "simple_history_manager_attribute", None
+        )
+        history_count = 0
+        if history_attribute:
+            history_model = getattr(model, history_attribute).model
+            history_count = _set_image(
+                history_model._default_manager.filter(**{field_name: raw_key}),
+                field_name,
+                key,
+            )
+    return bool(pks or history_count)
+
+
+def _set_image(queryset, field_name, key) -> int:
+    field = queryset.model._meta.get_field(field_name)
+    return queryset.update(**{field_name: key or (None if field.null else "")})
+
+
+def _get_processed_key(raw_key: str, image_format: str) -> str:
+    # Derived from the raw key, so any process can find it.
+    digest = hashlib.sha256(raw_key.encode()).hexdigest()[:32]
+    return f"{os.path.dirname(raw_key)}/{digest}.{_get_extension(image_format)}"
+
+
+def _get_extension(image_format: str) -> str:
+    return "jpg" if image_format == "JPEG" else image_format.lower()
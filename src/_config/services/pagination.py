@@ -0,0 +1,278 @@
+import base64
+import hashlib
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import Paginator
+from django.db import OperationalError, connections, transaction
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from system.collection_versions import get_collection_versions
+
+
+class KeysetPagination(PageNumberPagination):
+    """Page number pagination with an opt-in keyset (cursor) mode.
+
+    When the ``cursor`` param is given (empty for the first page), pages
+    are fetched after the last row of the previous one on the queryset
+    ordering, with ``id`` as tie-breaker, so that deep pages cost as much
+    as the first one and no count is run. Null values are sorted last.
+    """
+
+    page_size = settings.DEFAULT_PAGE_SIZE
+    page_size_query_param = settings.DEFAULT_PAGE_SIZE_QUERY_PARAM
+    max_page_size = settings.DEFAULT_MAX_PAGE_SIZE
+    cursor_query_param = "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        keys = self.get_ordering_keys(queryset)
+        ordering = [key for key, _, _, _, _ in keys]
+        cursor = request.query_params[self.cursor_query_param]
+        queryset = queryset.order_by(
+            *(
+                F(attname).desc(nulls_last=True)
+                if descending
+                else F(attname).asc(nulls_last=True)
+                for _, attname, descending, _, _ in keys
+            )
+        )
+        if cursor:
+            queryset = queryset.filter(
+                self.get_keyset_filter(keys, self.decode_cursor(cursor, keys))
+            )
+
+        rows = list(queryset[: page_size + 1])
+        self.next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_cursor = self.encode_cursor(
+                ordering,
+                [getattr(rows[-1], attname) for _, attname, _, _, _ in keys],
+            )
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(
+            OrderedDict(
+                [("next", self.get_next_cursor_link()), ("results", data)]
+            )
+        )
+
+    def get_next_cursor_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.next_cursor,
+        )
+
+    def get_ordering_keys(self, queryset) -> list:
+        """Return the (ordering, attname, descending, nullable, field) keys
+        of a queryset.
+        """
+        ordering = [
+            term
+            for term in queryset.query.order_by or queryset.model._meta.ordering
+            if isinstance(term, str)
+        ]
+        keys = []
+        for term in ordering:
+            name = term.lstrip("-")
+            if name == "pk":
+                name = "id"
+            if name in queryset.query.annotations:
+                attname, nullable = name, True
+                field = queryset.query.annotations[name].output_field
+            else:
+                try:
+                    field = queryset.model._meta.get_field(name)
+                except FieldDoesNotExist:
+                    field = None
+                if field is None or not field.concrete:
+                    raise ValidationError(
+                        {
+                            self.cursor_query_param: (
+                                f"Cursor pagination is not available when "
+                                f"ordering by '{name}'."
+                            )
+                        }
+                    )
+                attname, nullable = field.attname, field.null
+            keys.append((term, attname, term.startswith("-"), nullable, field))
+        if not any(attname == "id" for _, attname, _, _, _ in keys):
+            keys.append(
+                ("id", "id", False, False, queryset.model._meta.get_field("id"))
+            )
+        return keys
+
+    def get_keyset_filter(self, keys, values) -> Q:
+        """Return the filter matching the rows after a keyset position."""
+        keyset_filter = Q(pk__in=[])
+        equal = Q()
+        for (_, attname, descending, nullable, _), value in zip(keys, values):
+            if value is None:
+                # Nulls are sorted last, only other nulls follow.
+                equal &= Q(**{f"{attname}__isnull": True})
+                continue
+            after = Q(**{f"{attname}__{'lt' if descending else 'gt'}": value})
+            if nullable:
+                after |= Q(**{f"{attname}__isnull": True})
+            keyset_filter |= equal & after
+            equal &= Q(**{attname: value})
+        return keyset_filter
+
+    def encode_cursor(self, ordering, values) -> str:
+        # Datetimes keep their microseconds, unlike with DjangoJSONEncoder.
+        position = json.dumps([ordering, values], default=str)
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, cursor, keys) -> list:
+        """Return the values of a cursor, as prepared by the fields of the
+        keys it was encoded for.
+        """
+        try:
+            cursor_ordering, values = json.loads(
+                base64.urlsafe_b64decode(cursor.encode())
+            )
+        except (TypeError, ValueError):
+            raise NotFound("Invalid cursor.")
+        if (
+            cursor_ordering != [key for key, _, _, _, _ in keys]
+            or not isinstance(values, list)
+            or len(values) != len(keys)
+        ):
+            raise NotFound("Invalid cursor.")
+        try:
+            return [
+                None
+                if value is None
+                else field.get_prep_value(field.to_python(value))
+                for (_, _, _, _, field), value in zip(keys, values)
+            ]
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound("Invalid cursor.")
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator counting rows exactly only when it is cheap.
+
+    The planner estimate is used to decide: small results are counted
+    exactly. Larger ones use a count cached for the current version of
+    ``collections``, or are counted with a statement timeout, falling
+    back to the estimate. ``count_source`` tells which one was used.
+    """
+
+    def __init__(self, object_list, per_page, collections=(), **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.collections = collections
+        self.count_source = "exact"
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        estimate = self.get_estimate(queryset)
+        if estimate is None or estimate <= settings.PAGINATION_EXACT_COUNT_MAX:
+            return queryset.count()
+
+        cache_key = self.get_cache_key(queryset)
+        count = cache.get(cache_key)
+        if count is not None:
+            self.count_source = "cached"
+            return count
+        count = self.get_bounded_count(queryset)
+        if count is None:
+            self.count_source = "estimate"
+            return estimate
+        cache.set(cache_key, count, settings.PAGINATION_COUNT_CACHE_SECONDS)
+        return count
+
+    def get_estimate(self, queryset):
+        """Return the planner estimate of the number of rows, if any."""
+        sql, params = queryset.query.sql_with_params()
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"].get("Plan Rows")
+
+    def get_bounded_count(self, queryset):
+        """Return the exact count, or None when it takes longer than
+        ``PAGINATION_COUNT_TIMEOUT_MS``.
+        """
+        connection = connections[queryset.db]
+        try:
+            with transaction.atomic(using=queryset.db):
+                with connection.cursor() as cursor:
+                    cursor.execute("SHOW statement_timeout")
+                    (timeout,) = cursor.fetchone()
+                    cursor.execute(
+                        "SELECT set_config('statement_timeout', %s, true)",
+                        [str(settings.PAGINATION_COUNT_TIMEOUT_MS)],
+                    )
+                    count = queryset.count()
+                    # Released savepoints keep the setting until the end
+                    # of an outer transaction.
+                    cursor.execute(
+                        "SELECT set_config('statement_timeout', %s, true)",
+                        [timeout],
+                    )
+        except OperationalError:
+            return None
+        return count
+
+    def get_cache_key(self, queryset) -> str:
+        sql, params = queryset.query.sql_with_params()
+        versions = get_collection_versions(self.collections)
+        digest = hashlib.sha256(
+            json.dumps([sql, params, versions], default=str).encode()
+        ).hexdigest()
+        return f"pagination:count:{digest}"
+
+
+class EstimatedCountPagination(KeysetPagination):
+    """Keyset pagination whose page number mode counts rows cheaply.
+
+    ``count_collections`` names the collections whose changes invalidate
+    the cached counts, see ``system.collection_versions``.
+    """
+
+    count_collections = ()
+
+    def django_paginator_class(self, queryset, page_size):
+        return EstimatedCountPaginator(
+            queryset, page_size, collections=self.count_collections
+        )
+
+    def get_paginated_response(self, data):
+        if self.keyset:
+            return super().get_paginated_response(data)
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.page.paginator.count),
+                    ("count_source", self.page.paginator.count_source),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
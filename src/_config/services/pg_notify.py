@@ -0,0 +1,135 @@
+import logging
+import os
+import select
+import threading
+from collections import defaultdict
+
+import psycopg2
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two checks of the listener connection when idle.
+POLL_TIMEOUT = 5
+# Seconds to wait before reconnecting a lost listener connection, doubled
+# after each failed attempt up to MAX_RECONNECT_DELAY.
+RECONNECT_DELAY = 5
+MAX_RECONNECT_DELAY = 60
+
+
+def notify(channel: str, payload: str = "") -> None:
+    """Send a notification to every process listening on a channel.
+
+    Notifications sent inside a transaction are only delivered if and
+    when it commits.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [channel, payload])
+
+
+def subscribe(channel: str, callback):
+    """Call ``callback(payload)`` for each notification of a channel.
+
+    Callbacks are called from the listener thread of the process and must
+    not block. Return a function removing the subscription.
+    """
+    return _listener.subscribe(channel, callback)
+
+
+class NotificationListener:
+    """Single LISTEN connection shared by all the subscribers of a process."""
+
+    def __init__(self):
+        self._callbacks = defaultdict(set)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._connection = None
+        self._pending_channels = set()
+        # Written to when a channel is added, to wake the listener up.
+        self._wakeup_read, self._wakeup_write = os.pipe()
+
+    def subscribe(self, channel: str, callback):
+        with self._lock:
+            if not self._callbacks[channel]:
+                self._pending_channels.add(channel)
+                os.write(self._wakeup_write, b"\0")
+            self._callbacks[channel].add(callback)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="pg-notify-listener", daemon=True
+                )
+                self._thread.start()
+
+        def unsubscribe():
+            with self._lock:
+                self._callbacks[channel].discard(callback)
+
+        return unsubscribe
+
+    def _run(self):
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                self._connect()
+                delay = RECONNECT_DELAY
+                self._listen()
+            except Exception:
+                # Whatever the error, the thread must survive it: every
+                # subscriber of the process depends on it.
+                logger.exception("Postgres notification listener failed.")
+            finally:
+                self._close()
+            threading.Event().wait(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _close(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.close()
+        except Exception:
+            logger.exception("Closing the notification listener failed.")
+        self._connection = None
+
+    def _connect(self):
+        params = connections["default"].get_connection_params()
+        self._connection = psycopg2.connect(**params)
+        self._connection.set_isolation_level(
+            psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT
+        )
+        with self._lock:
+            self._pending_channels = set(self._callbacks)
+
+    def _listen(self):
+        while True:
+            self._listen_pending_channels()
+            readable, _, _ = select.select(
+                [self._connection, self._wakeup_read], [], [], POLL_TIMEOUT
+            )
+            if self._wakeup_read in readable:
+                os.read(self._wakeup_read, 1024)
+            if self._connection not in readable:
+                continue
+            self._connection.poll()
+            while self._connection.notifies:
+                notification = self._connection.notifies.pop(0)
+                self._dispatch(notification.channel, notification.payload)
+
+    def _listen_pending_channels(self):
+        with self._lock:
+            channels, self._pending_channels = self._pending_channels, set()
+        with self._connection.cursor() as cursor:
+            for channel in channels:
+                cursor.execute(f'LISTEN "{channel}"')
+
+    def _dispatch(self, channel: str, payload: str):
+        with self._lock:
+            callbacks = list(self._callbacks[channel])
+        for callback in callbacks:
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("Notification callback failed.")
+
+
+_listener = NotificationListener()
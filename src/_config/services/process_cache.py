@@ -0,0 +1,63 @@
+import threading
+import time
+
+from django.db import transaction
+
+from _config.services.pg_notify import notify, subscribe
+
+INVALIDATION_CHANNEL = "process_cache"
+
+
+class ProcessCache:
+    """In-process cache of rarely changing values.
+
+    Entries expire after ``ttl`` seconds. ``invalidate`` drops an entry in
+    every worker process through Postgres notifications, so no shared
+    cache service is needed; the TTL bounds staleness if a notification
+    is missed.
+    """
+
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._subscribed = False
+
+    def get(self, key: str, load):
+        """Return the value of a key, calling ``load()`` when missing."""
+        self._subscribe()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        value = load()
+        with self._lock:
+            self._entries[key] = (value, now + self.ttl)
+        return value
+
+    def invalidate(self, key: str) -> None:
+        """Drop a key in every process once the transaction commits."""
+        self._drop(key)
+        transaction.on_commit(
+            lambda: notify(INVALIDATION_CHANNEL, f"{self.name}:{key}")
+        )
+
+    def _drop(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _subscribe(self) -> None:
+        if self._subscribed:
+            return
+        with self._lock:
+            if self._subscribed:
+                return
+            self._subscribed = True
+        subscribe(INVALIDATION_CHANNEL, self._on_notification)
+
+    def _on_notification(self, payload: str) -> None:
+        name, _, key = payload.partition(":")
+        if name == self.name:
+            self._drop(key)
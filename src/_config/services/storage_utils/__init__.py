@@ -1,4 +1,6 @@
+from .file_response import get_file_response
 from .presigned_url import (
     generate_presigned_url,
+    generate_presigned_urls,
     generate_presigned_upload_url
 )
@@ -0,0 +1,186 @@
+import hashlib
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+
+from .. import image_processing
+from .presigned_url import generate_presigned_url
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+RANGE_CHUNK_SIZE = 64 * 1024
+# Only single byte ranges are served partially, others get the whole file.
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def get_file_response(
+    request,
+    file_key: str,
+    file_obj=None,
+    immutable: bool = False,
+    shared: bool = False,
+    default_content_type: str = "application/octet-stream",
+    last_modified=None,
+    image_variants: bool = False,
+):
+    """
+    Return the response sending a file whose access was authorized.
+
+    Depending on ``FILE_DELIVERY_MODE``, the file is streamed by the
+    worker, or its delivery is handed to the reverse proxy for local
+    storage and to a presigned URL for S3 and Swift. ``immutable`` files,
+    whose key changes with their content, are cacheable by browsers, and
+    by shared caches too when ``shared``. Their conditional requests are
+    answered without opening the file, and streamed files support single
+    byte ranges. With ``image_variants``, the derivative of the image the
+    request negotiates is sent instead, see ``get_image_variant_key``.
+    """
+    if image_variants:
+        variant_key = image_processing.get_image_variant_key(request, file_key)
+        if variant_key != file_key:
+            file_key, file_obj = variant_key, None
+    etag = get_file_etag(file_key) if immutable else None
+    last_modified = int(last_modified.timestamp()) if last_modified else None
+    if immutable:
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            _patch_file_response(response, etag, last_modified, shared)
+            return _patch_vary(response, image_variants)
+
+    if settings.FILE_DELIVERY_MODE != "python" and (
+        settings.STORAGE_BACKEND != "local"
+    ):
+        return _patch_vary(
+            HttpResponseRedirect(
+                generate_presigned_url(file_key, request, shared)
+            ),
+            image_variants,
+        )
+
+    content_type = mimetypes.guess_type(file_key)[0] or default_content_type
+    if settings.FILE_DELIVERY_MODE == "python":
+        if file_obj is None:
+            try:
+                file_obj = default_storage.open(file_key, "rb")
+            except FileNotFoundError:
+                raise Http404("File not found")
+        response = _get_streaming_response(
+            request, file_obj, content_type, etag
+        )
+    else:
+        response = HttpResponse(content_type=content_type)
+        if settings.FILE_DELIVERY_MODE == "x-accel-redirect":
+            prefix = settings.FILE_DELIVERY_ACCEL_PREFIX.rstrip("/")
+            response["X-Accel-Redirect"] = quote(f"{prefix}/{file_key}")
+        else:
+            response["X-Sendfile"] = default_storage.path(file_key)
+
+    if immutable:
+        _patch_file_response(response, etag, last_modified, shared)
+    return _patch_vary(response, image_variants)
+
+
+def get_file_etag(file_key: str) -> str:
+    """Return the ETag of a file whose key changes with its content."""
+    return quote_etag(hashlib.sha256(file_key.encode()).hexdigest()[:32])
+
+
+def _patch_file_response(response, etag, last_modified, shared):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(
+        response,
+        **({"public": True} if shared else {"private": True}),
+        max_age=IMMUTABLE_MAX_AGE,
+        immutable=True,
+    )
+    return response
+
+
+def _patch_vary(response, image_variants):
+    if image_variants:
+        patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def _get_streaming_response(request, file_obj, content_type, etag):
+    size = file_obj.size
+    try:
+        byte_range = _get_byte_range(request, size, etag)
+    except RangeNotSatisfiable:
+        file_obj.close()
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        response = FileResponse(file_obj, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(file_obj, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def _get_byte_range(request, size: int, etag):
+    """Return the (first, last) bytes requested, None for the whole file."""
+    header = request.META.get("HTTP_RANGE", "").strip()
+    match = RANGE_RE.match(header)
+    if match is None or not any(match.groups()):
+        return None
+    if_range = request.META.get("HTTP_IF_RANGE")
+    # Dates are not precise enough to validate a range, only ETags.
+    if if_range and (etag is None or if_range.strip() != etag):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def _read_range(file_obj, start: int, length: int):
+    try:
+        file_obj.seek(start)
+        while length > 0:
+            chunk = file_obj.read(min(RANGE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file_obj.close()
@@ -0,0 +1,114 @@
+import hashlib
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import FileField
+
+from .presigned_url import get_s3_client
+
+# Maximum number of keys per S3 DeleteObjects request.
+DELETE_BATCH_SIZE = 1000
+
+
+def get_referenced_file_keys() -> set:
+    """Return the file keys referenced by records and their history."""
+    file_keys = set()
+    for model in apps.get_models():
+        field_names = [
+            field.name
+            for field in model._meta.get_fields()
+            if isinstance(field, FileField)
+        ]
+        if not field_names:
+            continue
+        models = [model]
+        history_attribute = getattr(
+            model._meta, "simple_history_manager_attribute", None
+        )
+        if history_attribute:
+            # History copies file fields as text fields with the same name.
+            models.append(getattr(model, history_attribute).model)
+        for queryset_model in models:
+            for field_name in field_names:
+                file_keys.update(
+                    queryset_model._default_manager.exclude(**{field_name: ""})
+                    .exclude(**{f"{field_name}__isnull": True})
+                    .values_list(field_name, flat=True)
+                    .distinct()
+                )
+    return file_keys
+
+
+def is_referenced(file_key: str, referenced_stems: set) -> bool:
+    """Tell whether a stored file is one of the referenced ones, or one of
+    their processed versions or derivatives.
+    """
+    stem = os.path.splitext(file_key)[0]
+    base_stem, _, width = stem.rpartition("-")
+    return stem in referenced_stems or (
+        width.isdigit() and base_stem in referenced_stems
+    )
+
+
+def get_referenced_stems(file_keys) -> set:
+    """Return the stems of files, and of their processed versions, see
+    ``image_processing.save_image_upload``.
+    """
+    stems = set()
+    for file_key in file_keys:
+        stems.add(os.path.splitext(file_key)[0])
+        digest = hashlib.sha256(file_key.encode()).hexdigest()[:32]
+        stems.add(f"{os.path.dirname(file_key)}/{digest}")
+    return stems
+
+
+def iter_stored_files(prefix: str):
+    """Yield the (key, last modified datetime) of the files under a prefix.
+
+    S3 buckets are listed by pages, other storages directory by directory.
+    """
+    if settings.STORAGE_BACKEND == "s3":
+        paginator = get_s3_client().get_paginator("list_objects_v2")
+        for page in paginator.paginate(
+            Bucket=settings.AWS_STORAGE_BUCKET_NAME, Prefix=prefix
+        ):
+            for item in page.get("Contents", []):
+                yield item["Key"], item["LastModified"]
+        return
+    try:
+        directories, files = default_storage.listdir(prefix)
+    except FileNotFoundError:
+        return
+    for name in files:
+        file_key = f"{prefix}{name}"
+        yield file_key, default_storage.get_modified_time(file_key)
+    for name in directories:
+        yield from iter_stored_files(f"{prefix}{name}/")
+
+
+def delete_stored_files(file_keys: list) -> None:
+    """Delete files, in batches on S3."""
+    if settings.STORAGE_BACKEND != "s3":
+        for file_key in file_keys:
+            default_storage.delete(file_key)
+        return
+    client = get_s3_client()
+    for start in range(0, len(file_keys), DELETE_BATCH_SIZE):
+        response = client.delete_objects(
+            Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+            Delete={
+                "Objects": [
+                    {"Key": file_key}
+                    for file_key in file_keys[start : start + DELETE_BATCH_SIZE]
+                ],
+                "Quiet": True,
+            },
+        )
+        errors = response.get("Errors", [])
+        if errors:
+            raise OSError(
+                f"{len(errors)} files could not be deleted, "
+                f"first: {errors[0]['Key']} ({errors[0]['Message']})."
+            )
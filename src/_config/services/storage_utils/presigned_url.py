@@ -1,59 +1,195 @@
+import hashlib
+import hmac
+import mimetypes
 import os
-from datetime import timedelta
-from urllib.parse import urlencode
+import threading
+import time
+from urllib.parse import urlencode, urlparse
 
 from django.conf import settings
 from django.core import signing
 from django.core.files.storage import default_storage
-from django.utils import timezone
+from django.urls import reverse
+from django.utils.encoding import force_bytes
 
 from _config.services.utils import get_full_domain_from_request
 
-LOCAL_TOKEN_EXPIRATION = 3600  # 1 hour
+LOCAL_TOKEN_SALT = "local-file-url"
+# Timestamped tokens issued before URLs were made stable.
+LEGACY_LOCAL_TOKEN_SALT = "local-file-token"
+LOCAL_UPLOAD_TOKEN_SALT = "local-upload"
 
 
-def generate_presigned_url(file_key, request):
+class PresignedURLCache:
+    """In-process cache of presigned URLs.
+
+    Time is split in buckets of half the URLs lifetime, and URLs are
+    keyed by (key, backend, bucket): a cached URL is reused until the end
+    of its bucket, so it is always served with at least half its lifetime
+    left. Entries of past buckets are dropped, and the cache is cleared
+    when it holds more than ``max_size`` URLs.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._urls = {}
+        self._bucket = None
+        self._lock = threading.Lock()
+
+    def get(self, key: str, backend: str, expires_in: int, sign) -> str:
+        """Return the URL of a key, calling ``sign()`` when missing."""
+        bucket = int(time.time() // max(expires_in // 2, 1))
+        cache_key = (key, backend, bucket)
+        with self._lock:
+            if bucket != self._bucket:
+                self._urls = {}
+                self._bucket = bucket
+            url = self._urls.get(cache_key)
+        if url is None:
+            url = sign()
+            with self._lock:
+                if len(self._urls) >= self.max_size:
+                    self._urls = {}
+                if bucket == self._bucket:
+                    self._urls[cache_key] = url
+        return url
+
+
+class BatchTokenSigner(signing.Signer):
+    """Signer deriving its HMAC key once.
+
+    ``Signer.signature`` derives the HMAC key of its salt and secret for
+    each token. This signer derives it on creation, so signing a batch of
+    tokens only costs one HMAC each. Tokens carry no timestamp: the same
+    data always gives the same token.
+    """
+
+    def __init__(self, salt: str):
+        super().__init__(salt=salt)
+        derived_key = hashlib.sha256(
+            force_bytes(self.salt + "signer") + force_bytes(self.key)
+        ).digest()
+        self._hmac = hmac.new(derived_key, digestmod=hashlib.sha256)
+
+    def signature(self, value, key=None):
+        if key is not None or self.algorithm != "sha256":
+            return super().signature(value, key)
+        signature = self._hmac.copy()
+        signature.update(force_bytes(value))
+        return signing.b64_encode(signature.digest()).decode()
+
+
+presigned_url_cache = PresignedURLCache(settings.PRESIGNED_URL_CACHE_SIZE)
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def generate_presigned_url(file_key, request, shared: bool = False):
     """
     Return a presigned URL to access a file.
     """
+    return generate_presigned_urls([file_key], request, shared)[file_key]
+
+
+def generate_presigned_urls(file_keys, request, shared: bool = False) -> dict:
+    """
+    Return presigned URLs to access files, by file key.
+
+    Keys are signed together: the request and signing key are only
+    processed once for the whole batch. Local URLs stay the same during
+    ``FILE_URL_BUCKET_SECONDS`` so that browsers and proxies can cache
+    the files; ``shared`` URLs are not bound to the user, for files every
+    user allowed to list them may see.
+    """
+    file_keys = set(file_keys)
     if settings.STORAGE_BACKEND == "local":
         base_url = get_full_domain_from_request(request)
-        url = default_storage.url(file_key)
-
-        expires_at = (
-            timezone.now() + timedelta(seconds=LOCAL_TOKEN_EXPIRATION)
-        ).timestamp()
-        token_data = {
-            "file": file_key,
-            "exp": expires_at,
-            "user": request.user.id,
-        }
-        token = signing.dumps(token_data, salt="local-file-token")
-        url = f"{base_url}{url}?{urlencode({'token': token})}"
-        return url
+        # URLs of a bucket share their expiry, at least a bucket away.
+        bucket = settings.FILE_URL_BUCKET_SECONDS
+        expires_at = (int(time.time() // bucket) + 2) * bucket
+        signer = BatchTokenSigner(LOCAL_TOKEN_SALT)
+        urls = {}
+        for file_key in file_keys:
+            token_data = {"file": file_key, "exp": expires_at}
+            if not shared:
+                token_data["user"] = request.user.id
+            token = signer.sign_object(token_data)
+            url = default_storage.url(file_key)
+            urls[file_key] = f"{base_url}{url}?{urlencode({'token': token})}"
+        return urls
     if settings.STORAGE_BACKEND == "s3":
-        return get_s3_client().generate_presigned_url(
-            "get_object",
-            Params={
-                "Bucket": settings.AWS_STORAGE_BUCKET_NAME,
-                "Key": file_key,
-                "ResponseContentDisposition": f'inline; filename="{os.path.basename(file_key)}"',
-            },
-            ExpiresIn=getattr(settings, "PRESIGNED_MINIO_URL_EXPIRES_IN", 7200),
-        )
+        return {
+            file_key: presigned_url_cache.get(
+                file_key,
+                "s3",
+                settings.PRESIGNED_URL_EXPIRES_IN,
+                lambda file_key=file_key: _sign_s3_url(file_key),
+            )
+            for file_key in file_keys
+        }
     elif settings.STORAGE_BACKEND == "swift":
-        return default_storage.url(file_key)
+        return {
+            file_key: presigned_url_cache.get(
+                file_key,
+                "swift",
+                settings.SWIFT_TEMP_URL_DURATION,
+                lambda file_key=file_key: default_storage.url(file_key),
+            )
+            for file_key in file_keys
+        }
     else:
         raise ValueError(f"Unknown storage backend: {settings.STORAGE_BACKEND}")
 
 
+def _sign_s3_url(file_key: str) -> str:
+    return get_s3_client().generate_presigned_url(
+        "get_object",
+        Params={
+            "Bucket": settings.AWS_STORAGE_BUCKET_NAME,
+            "Key": file_key,
+            "ResponseContentDisposition": f'inline; filename="{os.path.basename(file_key)}"',
+        },
+        ExpiresIn=settings.PRESIGNED_URL_EXPIRES_IN,
+    )
+
+
+def read_local_file_token(token: str) -> dict:
+    """
+    Return the data of a local file URL token.
+
+    Raise ``signing.BadSignature`` if the token is invalid.
+    """
+    try:
+        return signing.Signer(salt=LOCAL_TOKEN_SALT).unsign_object(token)
+    except signing.BadSignature:
+        return signing.loads(token, salt=LEGACY_LOCAL_TOKEN_SALT)
+
+
 def generate_presigned_upload_url(
-    key: str, content_type: str = "application/octet-stream"
+    key: str,
+    content_type: str = "application/octet-stream",
+    request=None,
+    max_size: int = None,
 ):
     """
-    Return a presigned URL to upload a file.
+    Return a presigned URL to upload a file with a PUT request.
+
+    Local uploads go to the ``local-upload`` endpoint, which needs the
+    ``request`` for its domain and enforces ``max_size``. S3 and Swift
+    cannot limit the size of a PUT: callers check it once uploaded.
     """
-    if settings.STORAGE_BACKEND == "s3":
+    if settings.STORAGE_BACKEND == "local":
+        token = signing.dumps(
+            {"file": key, "type": content_type, "max": max_size},
+            salt=LOCAL_UPLOAD_TOKEN_SALT,
+        )
+        base_url = get_full_domain_from_request(request)
+        return (
+            f"{base_url}{reverse('local-upload')}?"
+            f"{urlencode({'token': token})}"
+        )
+
+    elif settings.STORAGE_BACKEND == "s3":
         return get_s3_client().generate_presigned_url(
             "put_object",
             Params={
@@ -61,45 +197,91 @@ def generate_presigned_upload_url(
                 "Key": key,
                 "ContentType": content_type,
             },
-            ExpiresIn=getattr(settings, "PRESIGNED_MINIO_URL_EXPIRES_IN", 7200),
+            ExpiresIn=settings.PRESIGNED_URL_EXPIRES_IN,
         )
 
     elif settings.STORAGE_BACKEND == "swift":
-        import hashlib
-        import hmac
-        import time
-
-        # Swift presigned PUT URL
-        expires = int(time.time()) + getattr(
-            settings, "SWIFT_TEMP_URL_DURATION", 3600
+        expires = int(time.time()) + settings.SWIFT_TEMP_URL_DURATION
+        object_url = (
+            f"{settings.SWIFT_STORAGE_URL.rstrip('/')}/"
+            f"{settings.SWIFT_CONTAINER_NAME}/{key}"
         )
-        base_path = f"/v1/AUTH_{settings.SWIFT_TENANT_NAME}/{settings.SWIFT_CONTAINER_NAME}/{key}"
-        key = settings.SWIFT_TEMP_URL_KEY.encode("utf-8")
-
-        # Create the HMAC signature
-        hmac_body = f"PUT\n{expires}\n{base_path}".encode("utf-8")
-        sig = hmac.new(key, hmac_body, digestmod=hashlib.sha1).hexdigest()
-
-        # Construct the full URL
-        swift_base_url = settings.SWIFT_AUTH_URL.replace(
-            "/identity/v3", "/v1/AUTH_" + settings.SWIFT_TENANT_NAME
+        # Temp URLs sign the path of the object, without the host.
+        hmac_body = f"PUT\n{expires}\n{urlparse(object_url).path}"
+        signature = hmac.new(
+            settings.SWIFT_TEMP_URL_KEY.encode(),
+            hmac_body.encode(),
+            digestmod=hashlib.sha1,
+        ).hexdigest()
+        query = urlencode(
+            {"temp_url_sig": signature, "temp_url_expires": expires}
         )
-        upload_url = f"{swift_base_url}/{settings.SWIFT_CONTAINER_NAME}/{key}?temp_url_sig={sig}&temp_url_expires={expires}"
-        return upload_url
+        return f"{object_url}?{query}"
 
     else:
         raise ValueError(f"Unknown storage backend: {settings.STORAGE_BACKEND}")
 
 
+def read_local_upload_token(token: str) -> dict:
+    """
+    Return the data of a local upload URL token.
+
+    Raise ``signing.BadSignature`` if the token is invalid or expired.
+    """
+    return signing.loads(
+        token,
+        salt=LOCAL_UPLOAD_TOKEN_SALT,
+        max_age=settings.PRESIGNED_URL_EXPIRES_IN,
+    )
+
+
+def get_stored_file_info(key: str) -> tuple[int, str]:
+    """
+    Return the size and content type of a stored file, without reading it.
+
+    Raise ``FileNotFoundError`` if there is no such file.
+    """
+    if settings.STORAGE_BACKEND == "s3":
+        from botocore.exceptions import ClientError
+
+        try:
+            head = get_s3_client().head_object(
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key
+            )
+        except ClientError as error:
+            if error.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                raise FileNotFoundError(key)
+            raise
+        return head["ContentLength"], head.get("ContentType", "")
+    if not default_storage.exists(key):
+        raise FileNotFoundError(key)
+    return default_storage.size(key), mimetypes.guess_type(key)[0] or ""
+
+
 def get_s3_client():
     """
-    Return an S3 client to interact with the S3 backend.
+    Return the S3 client of the process, shared between threads.
     """
+    return _get_client("s3", _create_s3_client)
+
+
+def _create_s3_client():
     import boto3
 
-    return boto3.client(
+    # Sessions are not thread-safe, clients built from them are.
+    return boto3.session.Session().client(
         "s3",
         endpoint_url=settings.AWS_S3_CUSTOM_DOMAIN,
         aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
         aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
     )
+
+
+def _get_client(name: str, create):
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = create()
+    return client
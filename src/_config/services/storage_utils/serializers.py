@@ -0,0 +1,68 @@
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+
+from .presigned_url import generate_presigned_url, generate_presigned_urls
+
+
+class PresignedURLMixin:
+    """Serializer mixin signing the file URLs of listed instances together.
+
+    ``get_file_keys`` returns the keys of the files of an instance, nested
+    serializers included. ``PresignedURLListSerializer`` signs those of a
+    whole list at once, and ``get_presigned_url`` reads them back.
+    ``has_shared_file_urls`` tells whether the URLs of an instance may be
+    shared between users, see ``generate_presigned_urls``.
+    """
+
+    shared_file_urls = False
+
+    def get_file_keys(self, instance) -> list:
+        """Return the keys of the files linked to an instance."""
+        return []
+
+    def has_shared_file_urls(self, instance) -> bool:
+        """Tell whether the file URLs of an instance may be shared."""
+        return self.shared_file_urls
+
+    def presign_urls(self, instances) -> None:
+        """Sign the URLs of the files of instances in one batch."""
+        file_keys = {False: set(), True: set()}
+        for instance in instances:
+            file_keys[self.has_shared_file_urls(instance)].update(
+                file_key
+                for file_key in self.get_file_keys(instance)
+                if file_key
+            )
+        self._presigned_urls = {}
+        for shared, shared_file_keys in file_keys.items():
+            if shared_file_keys:
+                self._presigned_urls.update(
+                    generate_presigned_urls(
+                        shared_file_keys, self.context["request"], shared
+                    )
+                )
+
+    def get_presigned_url(self, file_key: str, shared: bool = None) -> str:
+        """Return the URL of a file, signed with its list when possible."""
+        serializer = self
+        while serializer is not None:
+            presigned_urls = getattr(serializer, "_presigned_urls", {})
+            if file_key in presigned_urls:
+                return presigned_urls[file_key]
+            serializer = serializer.parent
+        return generate_presigned_url(
+            file_key,
+            self.context["request"],
+            self.shared_file_urls if shared is None else shared,
+        )
+
+
+class PresignedURLListSerializer(serializers.ListSerializer):
+    """List serializer signing the file URLs of its items in one batch."""
+
+    def to_representation(self, data):
+        if isinstance(data, BaseManager):
+            data = data.all()
+        data = list(data)
+        self.child.presign_urls(data)
+        return super().to_representation(data)
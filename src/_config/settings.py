@@ -54,6 +54,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "simple_history",
     "django_filters",
     "rest_framework",
@@ -159,6 +160,8 @@ AWS_S3_SECURE_URLS = False
 AWS_S3_USE_SSL = False
 AWS_REGION = os.getenv("S3_REGION", "us-east-1")
 PRESIGNED_URL_EXPIRES_IN = int(os.getenv("PRESIGNED_URL_EXPIRES_IN", "7200"))
+# Maximum number of presigned URLs cached by each process.
+PRESIGNED_URL_CACHE_SIZE = int(os.getenv("PRESIGNED_URL_CACHE_SIZE", "10000"))
 
 ### SWIFT - OBJECT STORAGE ###
 
@@ -170,6 +173,11 @@ SWIFT_PROJECT_DOMAIN_NAME = os.getenv("SWIFT_PROJECT_DOMAIN_NAME", None)
 SWIFT_USER_DOMAIN_NAME = os.getenv("SWIFT_USER_DOMAIN_NAME", None)
 SWIFT_REGION_NAME = os.getenv("SWIFT_REGION_NAME", None)
 SWIFT_CONTAINER_NAME = os.getenv("SWIFT_CONTAINER_NAME", None)
+# Object storage URL of the account, e.g. https://host/v1/AUTH_<project id>,
+# as listed by `openstack catalog show object-store`.
+SWIFT_STORAGE_URL = os.getenv("SWIFT_STORAGE_URL", None)
+if STORAGE_BACKEND == "swift" and not SWIFT_STORAGE_URL:
+    raise ValueError("SWIFT_STORAGE_URL is required with the swift backend.")
 SWIFT_AUTO_CREATE_CONTAINER = True
 SWIFT_USE_TEMP_URLS = True
 # to generate one: openstack container set albatross --property Temp-URL-Key=your_key_here
@@ -179,6 +187,28 @@ SWIFT_TEMP_URL_DURATION = int(
 )  # 1h
 SWIFT_AUTH_VERSION = os.getenv("SWIFT_AUTH_VERSION", "3")
 
+### FILE DELIVERY ###
+
+# How authorized files are sent once permissions are checked:
+# - "python": streamed by the application worker.
+# - "x-accel-redirect": handed to nginx through an internal location
+#   serving MEDIA_ROOT under FILE_DELIVERY_ACCEL_PREFIX.
+# - "x-sendfile": handed to Apache or Caddy with the file path.
+# S3 and Swift files are redirected to a presigned URL in both last modes.
+FILE_DELIVERY_MODES = ["python", "x-accel-redirect", "x-sendfile"]
+FILE_DELIVERY_MODE = os.getenv("FILE_DELIVERY_MODE", "python")
+if FILE_DELIVERY_MODE not in FILE_DELIVERY_MODES:
+    raise ValueError(
+        f"Invalid FILE_DELIVERY_MODE '{FILE_DELIVERY_MODE}'. "
+        f"Supported modes: {FILE_DELIVERY_MODES}"
+    )
+FILE_DELIVERY_ACCEL_PREFIX = os.getenv(
+    "FILE_DELIVERY_ACCEL_PREFIX", "/protected-files/"
+)
+# Seconds during which local file URLs stay the same, so that browsers
+# and proxies can cache the files. URLs are valid for one to two buckets.
+FILE_URL_BUCKET_SECONDS = int(os.getenv("FILE_URL_BUCKET_SECONDS", "3600"))
+
 ##################
 # AUTHENTICATION #
 ##################
@@ -392,6 +422,45 @@ SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 DEFAULT_PAGE_SIZE = 25
 DEFAULT_MAX_PAGE_SIZE = 1000
 DEFAULT_PAGE_SIZE_QUERY_PARAM = "limit"
+# Lists estimated above this number of rows are not counted exactly unless
+# the count is cached or takes less than PAGINATION_COUNT_TIMEOUT_MS.
+PAGINATION_EXACT_COUNT_MAX = 10000
+PAGINATION_COUNT_TIMEOUT_MS = 200
+PAGINATION_COUNT_CACHE_SECONDS = 3600
+
+### ACTIONS CATALOGUE SYNC ###
+
+# Sync tokens older than the retention trigger a full catalogue reset.
+ACTION_CHANGES_RETENTION_DAYS = int(
+    os.getenv("ACTION_CHANGES_RETENTION_DAYS", "30")
+)
+# Recent changes are only served once concurrent writes have committed.
+ACTION_CHANGES_SETTLE_SECONDS = 1
+# Server-sent events stream of catalogue changes (actions/mine/events).
+CATALOGUE_EVENTS_HEARTBEAT_SECONDS = 25
+CATALOGUE_EVENTS_RETRY_MS = 5000
+
+### ACTIONS SEARCH ###
+
+# "fulltext" ranks actions with the Postgres full-text index, "contains"
+# matches substrings. Clients may pick one with the search_backend param.
+ACTIONS_SEARCH_BACKEND = os.getenv("ACTIONS_SEARCH_BACKEND", "fulltext")
+# Text search configuration used to index and query actions. Changing it
+# requires running the update_action_search_vectors command.
+ACTIONS_SEARCH_CONFIG = os.getenv("ACTIONS_SEARCH_CONFIG", "simple")
+
+# Users, groups and roles search (actions/search), cached per user for
+# repeated type-ahead requests.
+PRINCIPAL_SEARCH_MAX_LIMIT = 50
+PRINCIPAL_SEARCH_CACHE_SECONDS = 30
+
+### SYSTEM SETTINGS ###
+
+# System settings are cached in each worker for this number of seconds,
+# saves are propagated to all workers immediately.
+SINGLETON_CACHE_SECONDS = 60
+# Same for the id of the ADMIN_GROUP group, invalidated on group changes.
+ADMIN_GROUP_CACHE_SECONDS = 300
 
 ### HISTORY ###
 
@@ -401,6 +470,27 @@ SIMPLE_HISTORY_FILEFIELD_TO_CHARFIELD = True
 
 GALLERY_BACKGROUND_IMAGE_RESOLUTION = (1920, 1080)
 GALLERY_BACKGROUND_IMAGE_FORMAT = "PNG"
+# Uploaded images are stored as is, then resized by this many worker
+# processes. With 0, they are resized inline, during the upload request.
+IMAGE_PROCESSING_WORKERS = int(os.getenv("IMAGE_PROCESSING_WORKERS", "2"))
+# Processed images are also stored in these formats, by order of
+# preference, and at these smaller widths, to be negotiated by clients.
+IMAGE_DERIVATIVE_FORMATS = [
+    image_format.strip().upper()
+    for image_format in os.getenv("IMAGE_DERIVATIVE_FORMATS", "WEBP").split(",")
+    if image_format.strip()
+]
+IMAGE_DERIVATIVE_WIDTHS = [
+    int(width)
+    for width in os.getenv("IMAGE_DERIVATIVE_WIDTHS", "480,960").split(",")
+    if width.strip()
+]
+IMAGE_DERIVATIVE_QUALITY = int(os.getenv("IMAGE_DERIVATIVE_QUALITY", "80"))
+# Uploaded files no record references are deleted by the
+# collect_orphaned_uploads command once older than this.
+ORPHANED_UPLOADS_GRACE_HOURS = int(
+    os.getenv("ORPHANED_UPLOADS_GRACE_HOURS", "24")
+)
 
 ### JUMPER FRONTEND UPDATES ###
 
@@ -6,6 +6,7 @@ from rest_framework import routers
 from .services.swagger import swagger_urls
 from .views.app_info_views import get_app_info
 from .views.front_updater_views import check_update
+from .views.upload_views import local_upload
 
 router = routers.DefaultRouter(trailing_slash=False)
 
@@ -22,6 +23,7 @@ urlpatterns = [
                 path("", get_app_info, name="app-info"),
                 path("", get_app_info, name="app-info"),
                 path("frontend-update", check_update, name="frontend-update"),
+                path("uploads", local_upload, name="local-upload"),
                 path("", include("users.urls")),
                 path("", include("auths.urls")),
                 path("", include("actions.urls")),
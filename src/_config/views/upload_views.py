@@ -0,0 +1,54 @@
+import tempfile
+
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+)
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from _config.services.storage_utils.presigned_url import (
+    read_local_upload_token,
+)
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+@csrf_exempt
+@require_http_methods(["PUT"])
+def local_upload(request):
+    """Store the body of a PUT to a presigned local upload URL.
+
+    Stands in for S3 and Swift presigned uploads with local storage.
+    """
+    if settings.STORAGE_BACKEND != "local":
+        raise Http404()
+    try:
+        data = read_local_upload_token(request.GET.get("token", ""))
+    except signing.BadSignature:
+        return HttpResponseForbidden("Invalid or expired token.")
+    if request.content_type != data["type"]:
+        return HttpResponseBadRequest(f"Content-Type must be {data['type']}.")
+    if default_storage.exists(data["file"]):
+        return HttpResponse("File already uploaded.", status=409)
+
+    max_size = data["max"]
+    content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+    if max_size is not None and content_length > max_size:
+        return HttpResponse("File too large.", status=413)
+    with tempfile.SpooledTemporaryFile() as upload:
+        size = 0
+        while chunk := request.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if max_size is not None and size > max_size:
+                return HttpResponse("File too large.", status=413)
+            upload.write(chunk)
+        upload.seek(0)
+        default_storage.save(data["file"], File(upload))
+    return HttpResponse(status=200)
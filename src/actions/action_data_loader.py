@@ -0,0 +1,72 @@
+from bisect import bisect_right
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+
+from actions.models import Action
+
+
+def attach_action_data(actions) -> list:
+    """Resolve the data of actions with one query per data type.
+
+    Historical actions are left untouched, see
+    ``attach_historical_action_data``.
+    """
+    actions = list(actions)
+    pending = [
+        action
+        for action in actions
+        if isinstance(action, Action) and not Action.data.is_cached(action)
+    ]
+    for content_type_id, type_actions in _group_by_content_type(
+        pending
+    ).items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        data_by_id = model.objects.in_bulk(
+            {action.object_id for action in type_actions}
+        )
+        for action in type_actions:
+            if action.object_id in data_by_id:
+                action.data = data_by_id[action.object_id]
+    return actions
+
+
+def attach_historical_action_data(action_versions) -> list:
+    """Resolve the data of historical actions as of each version date.
+
+    Data histories are fetched with one query per data type, then each
+    version gets the latest data record not newer than itself.
+    """
+    action_versions = list(action_versions)
+    for content_type_id, type_versions in _group_by_content_type(
+        action_versions
+    ).items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        records_by_id = defaultdict(list)
+        for record in model.history.filter(
+            id__in={version.object_id for version in type_versions}
+        ).order_by("history_date", "history_id"):
+            records_by_id[record.id].append(record)
+        dates_by_id = {
+            object_id: [record.history_date for record in records]
+            for object_id, records in records_by_id.items()
+        }
+        for version in type_versions:
+            records = records_by_id.get(version.object_id, [])
+            index = bisect_right(
+                dates_by_id.get(version.object_id, []), version.history_date
+            )
+            record = records[index - 1] if index else None
+            version.data = (
+                record.instance
+                if record and record.history_type != "-"
+                else None
+            )
+    return action_versions
+
+
+def _group_by_content_type(actions) -> dict:
+    actions_by_content_type = defaultdict(list)
+    for action in actions:
+        actions_by_content_type[action.content_type_id].append(action)
+    return actions_by_content_type
@@ -0,0 +1,131 @@
+import base64
+import json
+from collections import defaultdict
+from datetime import datetime
+
+from django.db.models import Q
+
+from actions.action_data_loader import attach_historical_action_data
+from actions.models import Action
+from users.models import Group, Role, User
+
+ACL_FIELDS = {"users": User, "groups": Group, "roles": Role}
+
+
+def get_action_editions(action: Action, since=None, until=None):
+    """Return the edition versions of an action, newest first."""
+    editions = action.history.exclude(
+        Q(history_change_reason__isnull=True) | Q(history_change_reason="")
+    )
+    if since:
+        editions = editions.filter(history_date__gte=since)
+    if until:
+        editions = editions.filter(history_date__lte=until)
+    return editions.order_by("-history_date", "-history_id")
+
+
+def get_edition_number(action: Action, version) -> int:
+    """Return the position of a version in the editions of its action."""
+    return (
+        get_action_editions(action)
+        .filter(
+            Q(history_date__lt=version.history_date)
+            | Q(
+                history_date=version.history_date,
+                history_id__lte=version.history_id,
+            )
+        )
+        .count()
+    )
+
+
+def build_action_timeline(action_versions, with_data: bool = True) -> list:
+    """Resolve the data and relations of historical actions.
+
+    Versions data, their users, groups and roles, and the users who made
+    them are loaded with a fixed number of queries whatever the number of
+    versions. Without ``with_data``, the data history is not loaded and
+    ``data`` is set to None.
+    """
+    versions = list(action_versions)
+    if with_data:
+        attach_historical_action_data(versions)
+    else:
+        for version in versions:
+            version.data = None
+    history_ids = [version.history_id for version in versions]
+
+    member_ids = {}
+    for field_name in ACL_FIELDS:
+        member_ids[field_name] = _get_historical_member_ids(
+            field_name, history_ids
+        )
+
+    user_ids = {version.history_user_id for version in versions}
+    for ids in member_ids["users"].values():
+        user_ids.update(ids)
+    members = {
+        "users": User.objects.in_bulk(user_ids - {None}),
+        "groups": Group.objects.in_bulk(
+            set().union(*member_ids["groups"].values())
+        ),
+        "roles": Role.objects.in_bulk(
+            set().union(*member_ids["roles"].values())
+        ),
+    }
+
+    for version in versions:
+        for field_name, instances in members.items():
+            setattr(
+                version,
+                field_name,
+                [
+                    instances[member_id]
+                    for member_id in member_ids[field_name][version.history_id]
+                    if member_id in instances
+                ],
+            )
+        version.history_user = members["users"].get(version.history_user_id)
+    return versions
+
+
+def _get_historical_member_ids(field_name, history_ids) -> dict:
+    field = Action._meta.get_field(field_name)
+    historical_model = getattr(Action.history.model, field_name).model
+    member_ids = defaultdict(list)
+    for history_id, member_id in historical_model.objects.filter(
+        history_id__in=history_ids
+    ).values_list("history_id", f"{field.m2m_reverse_field_name()}_id"):
+        member_ids[history_id].append(member_id)
+    return member_ids
+
+
+def encode_edition_cursor(version) -> str:
+    """Return an opaque cursor pointing after a version."""
+    position = json.dumps(
+        [version.history_date.isoformat(), version.history_id]
+    )
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_edition_cursor(cursor: str) -> tuple:
+    """Return the (history_date, history_id) position of a cursor."""
+    try:
+        history_date, history_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+        history_date = datetime.fromisoformat(history_date)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor.")
+    if not isinstance(history_id, int):
+        raise ValueError("Invalid cursor.")
+    return history_date, history_id
+
+
+def get_editions_after(editions, position: tuple):
+    """Return the editions older than a cursor position."""
+    history_date, history_id = position
+    return editions.filter(
+        Q(history_date__lt=history_date)
+        | Q(history_date=history_date, history_id__lt=history_id)
+    )
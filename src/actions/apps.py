@@ -1,6 +1,88 @@
 from django.apps import AppConfig
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 
 
 class ActionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'actions'
+
+    def ready(self):
+        from _config.services.image_processing import image_upload_processed
+        from actions.models import Action, ActionData
+        from actions.signals import (
+            capture_action_audience,
+            capture_actions_on_principal_delete,
+            invalidate_catalogues_on_action_acl_change,
+            invalidate_catalogues_on_action_data_save,
+            invalidate_catalogues_on_action_delete,
+            invalidate_catalogues_on_action_save,
+            invalidate_catalogues_on_principals_change,
+            record_change_on_action_acl_change,
+            record_change_on_action_data_save,
+            record_change_on_action_save,
+            record_change_on_principal_delete,
+            record_change_on_principals_change,
+            refresh_catalogues_on_thumbnail_processed,
+            update_search_vector_on_action_save,
+        )
+        from system.collection_versions import track_collection
+        from users.models import Group, Role
+        from users.principals import user_principals_changed
+
+        pre_save.connect(capture_action_audience, sender=Action)
+        post_save.connect(invalidate_catalogues_on_action_save, sender=Action)
+        post_save.connect(record_change_on_action_save, sender=Action)
+        post_save.connect(update_search_vector_on_action_save, sender=Action)
+        pre_delete.connect(capture_action_audience, sender=Action)
+        post_delete.connect(
+            invalidate_catalogues_on_action_delete, sender=Action
+        )
+        post_delete.connect(record_change_on_action_save, sender=Action)
+        for action_data_model in ActionData.__subclasses__():
+            post_save.connect(
+                invalidate_catalogues_on_action_data_save,
+                sender=action_data_model,
+            )
+            post_save.connect(
+                record_change_on_action_data_save, sender=action_data_model
+            )
+        for through in (
+            Action.users.through,
+            Action.groups.through,
+            Action.roles.through,
+        ):
+            m2m_changed.connect(
+                invalidate_catalogues_on_action_acl_change, sender=through
+            )
+            m2m_changed.connect(
+                record_change_on_action_acl_change, sender=through
+            )
+        image_upload_processed.connect(
+            refresh_catalogues_on_thumbnail_processed, sender=Action
+        )
+        for principal_model in (Group, Role):
+            pre_delete.connect(
+                capture_actions_on_principal_delete, sender=principal_model
+            )
+            post_delete.connect(
+                record_change_on_principal_delete, sender=principal_model
+            )
+        user_principals_changed.connect(
+            invalidate_catalogues_on_principals_change
+        )
+        user_principals_changed.connect(record_change_on_principals_change)
+        track_collection(
+            "actions",
+            models=[Action],
+            through_models=[
+                Action.users.through,
+                Action.groups.through,
+                Action.roles.through,
+            ],
+        )
@@ -0,0 +1,245 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from _config.services.storage_utils import generate_presigned_urls
+from actions.catalogue_events import publish_catalogue_changes
+from actions.models import Action, ActionChange, UserCatalogue
+from actions.serializers.action_serializers import ActionPlayableSerializer
+from users.models import UserPrincipal
+from users.principals import get_user_access_filter
+
+
+class ActionCatalogueSerializer(ActionPlayableSerializer):
+    """Playable serializer storing thumbnail keys instead of signed urls."""
+
+    def get_thumbnail_url(self, action: Action) -> str:
+        """Return thumbnail key, signed when the catalogue is served."""
+        return action.thumbnail.name if action.thumbnail else None
+
+    def presign_urls(self, instances) -> None:
+        """Do not sign thumbnails, the catalogue stores their keys."""
+
+    class Meta(ActionPlayableSerializer.Meta):
+        pass
+
+
+def get_user_playable_actions(user):
+    """Return the active actions visible to a user."""
+    return Action.objects.filter(is_active=True).filter(
+        # Actions linked to user directly, via group, role or role group
+        get_user_access_filter(Action, user)
+        | Q(is_public=True)  # Actions marked as public
+    )
+
+
+def get_user_catalogue(user, request) -> tuple[list, int]:
+    """Return the serialized playable actions of a user and their version.
+
+    The catalogue is served from its materialized payload when it is up
+    to date, and rebuilt otherwise.
+    """
+    catalogue = UserCatalogue.objects.filter(user=user).first()
+    if catalogue is None:
+        catalogue, _ = UserCatalogue.objects.get_or_create(user=user)
+    if catalogue.payload is None:
+        catalogue.payload = build_user_catalogue(user, catalogue.version)
+    # Only the thumbnails of public actions are signed for every user.
+    thumbnail_urls = {}
+    for shared in (False, True):
+        thumbnail_urls.update(
+            generate_presigned_urls(
+                {
+                    item["thumbnail_url"]
+                    for item in catalogue.payload
+                    if item["is_public"] == shared
+                }
+                - {None, ""},
+                request,
+                shared=shared,
+            )
+        )
+    return [
+        {
+            **item,
+            "thumbnail_url": thumbnail_urls.get(item["thumbnail_url"]),
+        }
+        for item in catalogue.payload
+    ], catalogue.version
+
+
+def build_user_catalogue(user, version: int) -> list:
+    """Serialize and store the catalogue of a user.
+
+    The payload is only stored if the catalogue was not invalidated
+    meanwhile, i.e. if its version is still ``version``.
+    """
+    actions = get_user_playable_actions(user).order_by("name")
+    payload = ActionCatalogueSerializer(actions, many=True).data
+    UserCatalogue.objects.filter(user=user, version=version).update(
+        payload=payload
+    )
+    return payload
+
+
+def invalidate_user_catalogues(user_ids=None) -> None:
+    """Invalidate the catalogues of the given users, or of every user.
+
+    Their connected clients are notified once the transaction commits.
+    """
+    catalogues = UserCatalogue.objects.all()
+    if user_ids is not None:
+        if not user_ids:
+            return
+        catalogues = catalogues.filter(user_id__in=user_ids)
+    catalogues.update(version=F("version") + 1, payload=None)
+    publish_catalogue_changes(user_ids)
+
+
+def record_action_changes(action_ids) -> None:
+    """Log a change of the given actions once the transaction commits."""
+    changes = [ActionChange(action_id=action_id) for action_id in action_ids]
+    if changes:
+        transaction.on_commit(lambda: ActionChange.objects.bulk_create(changes))
+
+
+def record_action_revocations(action_ids, user_ids) -> None:
+    """Log that users may have lost access to actions, so that they are
+    told once they sync. ``user_ids`` None stands for every user, whose
+    whole catalogue is then logged as changed.
+    """
+    if user_ids is None:
+        record_catalogue_changes()
+        return
+    changes = [
+        ActionChange(action_id=action_id, user_id=user_id)
+        for action_id in action_ids
+        for user_id in user_ids
+    ]
+    if changes:
+        transaction.on_commit(lambda: ActionChange.objects.bulk_create(changes))
+
+
+def record_catalogue_changes(user_ids=None) -> None:
+    """Log a change of the whole catalogue of users, or of every user."""
+    if user_ids is None:
+        changes = [ActionChange()]
+    else:
+        changes = [ActionChange(user_id=user_id) for user_id in user_ids]
+    if changes:
+        transaction.on_commit(lambda: ActionChange.objects.bulk_create(changes))
+
+
+def get_catalogue_changes(user, token: str, request) -> dict:
+    """Return the catalogue changes of a user since a sync token.
+
+    The changes hold the added or updated playable actions, the ids of the
+    ones the user lost access to and a new sync token. When the token is missing, expired
+    or a change concerns the whole catalogue, the full catalogue is
+    returned with ``reset`` set.
+    """
+    since = _read_changes_token(token)
+    settled = ActionChange.objects.filter(
+        creation_date__lte=timezone.now()
+        - timedelta(seconds=settings.ACTION_CHANGES_SETTLE_SECONDS)
+    )
+    if since is None:
+        last_change_id = settled.aggregate(last_id=Max("id"))["last_id"]
+        return _get_catalogue_reset(user, last_change_id or 0, request)
+
+    changes = list(
+        settled.filter(id__gt=since)
+        .filter(Q(user__isnull=True) | Q(user=user))
+        .values_list("id", "action_id", "user_id")
+    )
+    if not changes:
+        return {
+            "token": _sign_changes_token(since),
+            "reset": False,
+            "actions": [],
+            "revoked": [],
+        }
+    last_change_id = max(change_id for change_id, _, _ in changes)
+    if any(action_id is None for _, action_id, _ in changes):
+        return _get_catalogue_reset(user, last_change_id, request)
+
+    action_ids = {action_id for _, action_id, _ in changes}
+    # Only actions the user had may be reported as revoked.
+    revoked_ids = {action_id for _, action_id, user_id in changes if user_id}
+    actions = ActionPlayableSerializer(
+        get_user_playable_actions(user)
+        .filter(pk__in=action_ids)
+        .order_by("name"),
+        many=True,
+        context={"request": request},
+    ).data
+    return {
+        "token": _sign_changes_token(last_change_id),
+        "reset": False,
+        "actions": actions,
+        "revoked": sorted(revoked_ids - {action["id"] for action in actions}),
+    }
+
+
+def _get_catalogue_reset(user, last_change_id: int, request) -> dict:
+    actions, _ = get_user_catalogue(user, request)
+    return {
+        "token": _sign_changes_token(last_change_id),
+        "reset": True,
+        "actions": actions,
+        "revoked": [],
+    }
+
+
+def _sign_changes_token(change_id: int) -> str:
+    return signing.TimestampSigner(salt="actions-changes").sign(str(change_id))
+
+
+def _read_changes_token(token: str):
+    if not token:
+        return None
+    try:
+        return int(
+            signing.TimestampSigner(salt="actions-changes").unsign(
+                token,
+                max_age=timedelta(days=settings.ACTION_CHANGES_RETENTION_DAYS),
+            )
+        )
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def get_actions_audience(action_ids):
+    """Return the ids of the users who can see any of the given actions.
+
+    Return None when one of the actions is public.
+    """
+    if Action.objects.filter(pk__in=action_ids, is_public=True).exists():
+        return None
+    user_ids = set(
+        Action.users.through.objects.filter(
+            action_id__in=action_ids
+        ).values_list("user_id", flat=True)
+    )
+    user_ids |= get_principals_audience(
+        group_ids=Action.groups.through.objects.filter(
+            action_id__in=action_ids
+        ).values("group_id"),
+        role_ids=Action.roles.through.objects.filter(
+            action_id__in=action_ids
+        ).values("role_id"),
+    )
+    return user_ids
+
+
+def get_principals_audience(group_ids=(), role_ids=()) -> set:
+    """Return the ids of the users member of the given groups or roles."""
+    return set(
+        UserPrincipal.objects.filter(
+            Q(group_id__in=group_ids) | Q(role_id__in=role_ids)
+        ).values_list("user_id", flat=True)
+    )
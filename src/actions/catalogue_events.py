@@ -0,0 +1,80 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from _config.services.pg_notify import notify, subscribe
+
+CATALOGUE_CHANNEL = "actions_catalogue"
+# Postgres rejects notification payloads of 8000 bytes or more.
+MAX_PAYLOAD_SIZE = 7900
+
+
+def publish_catalogue_changes(user_ids=None) -> None:
+    """Notify the connected users whose catalogue changed, or every user.
+
+    Too many users to fit in one notification are notified as everyone.
+    """
+    if user_ids is not None:
+        if not user_ids:
+            return
+        payload = json.dumps(sorted(user_ids))
+        if len(payload) < MAX_PAYLOAD_SIZE:
+            notify(CATALOGUE_CHANNEL, payload)
+            return
+    notify(CATALOGUE_CHANNEL, "")
+
+
+class CatalogueEventHub:
+    """Dispatch the catalogue notifications to the event streams of users.
+
+    Each stream owns an asyncio queue, fed from the notification listener
+    thread with ``call_soon_threadsafe``, so idle streams cost no thread.
+    """
+
+    def __init__(self):
+        self._queues = defaultdict(dict)
+        self._lock = threading.Lock()
+        self._unsubscribe = None
+
+    def connect(self, user_id) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=1)
+        with self._lock:
+            self._queues[user_id][queue] = asyncio.get_running_loop()
+            if self._unsubscribe is None:
+                self._unsubscribe = subscribe(
+                    CATALOGUE_CHANNEL, self._on_notification
+                )
+        return queue
+
+    def disconnect(self, user_id, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._queues[user_id].pop(queue, None)
+            if not self._queues[user_id]:
+                del self._queues[user_id]
+
+    def _on_notification(self, payload: str) -> None:
+        with self._lock:
+            if payload:
+                queues = [
+                    item
+                    for user_id in json.loads(payload)
+                    for item in self._queues.get(user_id, {}).items()
+                ]
+            else:
+                queues = [
+                    item
+                    for user_queues in self._queues.values()
+                    for item in user_queues.items()
+                ]
+        for queue, loop in queues:
+            loop.call_soon_threadsafe(_signal, queue)
+
+
+def _signal(queue: asyncio.Queue) -> None:
+    # A pending signal already covers the new change.
+    if not queue.full():
+        queue.put_nowait(None)
+
+
+catalogue_event_hub = CatalogueEventHub()
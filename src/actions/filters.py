@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchRank
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+from actions.models.action_data_models import (
+    ActionData,
+    get_action_data_content_type_id,
+)
+from actions.models.action_models import Action
+from actions.search import build_action_search_query
+
+SEARCH_BACKENDS = ("fulltext", "contains")
+
+
+class ActionFilter(filters.FilterSet):
+    """Filters for Action model."""
+
+    type = filters.ChoiceFilter(
+        choices=[
+            (model.TYPE, model.TYPE) for model in ActionData.__subclasses__()
+        ],
+        method="filter_type",
+    )
+
+    class Meta:
+        model = Action
+        fields = ["type"]
+
+    def filter_type(self, queryset, name, value):
+        """Filter actions on their data type, using the content type index."""
+        return queryset.filter(
+            content_type_id=get_action_data_content_type_id(value)
+        )
+
+
+class ActionSearchFilter(SearchFilter):
+    """Search actions with the full-text index or by substring.
+
+    The backend defaults to ``ACTIONS_SEARCH_BACKEND`` and can be picked
+    with the ``search_backend`` query param. Full-text results are ranked
+    by relevance unless an ordering is requested.
+    """
+
+    backend_param = "search_backend"
+
+    def filter_queryset(self, request, queryset, view):
+        # The backend is only checked when searching.
+        if not self.get_search_terms(request):
+            return queryset
+        backend = request.query_params.get(
+            self.backend_param, settings.ACTIONS_SEARCH_BACKEND
+        )
+        if backend not in SEARCH_BACKENDS:
+            raise ValidationError(
+                {
+                    self.backend_param: (
+                        f"Must be one of: {', '.join(SEARCH_BACKENDS)}."
+                    )
+                }
+            )
+        if backend == "contains":
+            return super().filter_queryset(request, queryset, view)
+
+        query = build_action_search_query(
+            request.query_params.get(self.search_param, "")
+        )
+        if query is None:
+            return queryset
+        queryset = queryset.filter(search_vector=query)
+        if OrderingFilter.ordering_param in request.query_params:
+            return queryset
+        # Ranks are cast from real so that cursors keep their exact value.
+        return queryset.annotate(
+            search_rank=Cast(
+                SearchRank(F("search_vector"), query), FloatField()
+            )
+        ).order_by("-search_rank", "name")
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from actions.models import ActionChange
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the actions catalogue change log entries older than "
+        "ACTION_CHANGES_RETENTION_DAYS."
+    )
+
+    def handle(self, *args, **options):
+        count, _ = ActionChange.objects.filter(
+            creation_date__lt=timezone.now()
+            - timedelta(days=settings.ACTION_CHANGES_RETENTION_DAYS)
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"{count} action changes deleted.")
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from actions.search import update_action_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search document of every action."
+
+    def handle(self, *args, **options):
+        update_action_search_vectors()
+        self.stdout.write(self.style.SUCCESS("Action search vectors updated."))
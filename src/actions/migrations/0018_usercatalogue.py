@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0007_userprincipal"),
+        ("actions", "0017_action_section_historicalaction_section"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserCatalogue",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="catalogue",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("version", models.PositiveBigIntegerField(default=0)),
+                ("payload", models.JSONField(blank=True, null=True)),
+                ("last_update", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
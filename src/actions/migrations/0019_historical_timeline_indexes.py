@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# Historical models are generated by simple_history, so their timeline
+# indexes are managed here rather than through model Meta.
+TIMELINE_INDEXES = [
+    (
+        "actions_historicalaction",
+        "actions_historicalaction_timeline_idx",
+        "id, history_date DESC, history_id DESC",
+    ),
+    (
+        "actions_historicalpythonactiondata",
+        "actions_historicalpythonactiondata_timeline_idx",
+        "id, history_date, history_id",
+    ),
+    (
+        "actions_historicalwindowscmdactiondata",
+        "actions_historicalwindowscmdactiondata_timeline_idx",
+        "id, history_date, history_id",
+    ),
+    (
+        "actions_historicallinkactiondata",
+        "actions_historicallinkactiondata_timeline_idx",
+        "id, history_date, history_id",
+    ),
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("actions", "0018_usercatalogue"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({columns});",
+            f"DROP INDEX IF EXISTS {index};",
+        )
+        for table, index, columns in TIMELINE_INDEXES
+    ]
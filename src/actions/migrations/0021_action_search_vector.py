@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:02
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def fill_search_vectors(apps, schema_editor):
+    Action = apps.get_model("actions", "Action")
+    config = settings.ACTIONS_SEARCH_CONFIG
+    Action.objects.update(
+        search_vector=SearchVector("name", weight="A", config=config)
+        + SearchVector("section", weight="B", config=config)
+        + SearchVector("description", weight="C", config=config)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("actions", "0020_actionchange"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="action",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="action",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="actions_act_search__a9a17c_gin"
+            ),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+    ]
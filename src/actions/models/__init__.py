@@ -1,4 +1,12 @@
 from .action_models import Action
 from .action_data_models import ActionData, PythonActionData, LinkActionData
+from .catalogue_models import ActionChange, UserCatalogue
 
-__all__ = ["Action", "ActionData", "PythonActionData", "LinkActionData"]
\ No newline at end of file
+__all__ = [
+    "Action",
+    "ActionChange",
+    "ActionData",
+    "PythonActionData",
+    "LinkActionData",
+    "UserCatalogue",
+]
@@ -1,4 +1,6 @@
 from abc import ABCMeta, abstractmethod
+from functools import cache
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from simple_history.models import HistoricalRecords
 from django.core.exceptions import ValidationError
@@ -63,3 +65,27 @@ class LinkActionData(ActionData):
         default="https://example.com",
         validators=[validate_url_format],
     )
+
+
+@cache
+def get_action_data_models() -> dict:
+    """Return ActionData subclasses by content type id, cached per process."""
+    content_types = ContentType.objects.get_for_models(
+        *ActionData.__subclasses__()
+    )
+    return {
+        content_type.id: model for model, content_type in content_types.items()
+    }
+
+
+def get_action_data_model(content_type_id: int):
+    """Return the ActionData subclass stored under a content type id."""
+    return get_action_data_models()[content_type_id]
+
+
+def get_action_data_content_type_id(data_type: str) -> int:
+    """Return the content type id of an ActionData type name."""
+    for content_type_id, model in get_action_data_models().items():
+        if model.TYPE == data_type:
+            return content_type_id
+    raise KeyError(data_type)
@@ -1,5 +1,7 @@
 import uuid
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.validators import MinLengthValidator
@@ -29,7 +31,10 @@ class Action(models.Model):
 
     THUMBNAIL_RESOLUTION = (80, 80)
     THUMBNAIL_FORMAT = "PNG"
-    history = HistoricalRecords(m2m_fields=["users", "groups", "roles"])
+    history = HistoricalRecords(
+        m2m_fields=["users", "groups", "roles"],
+        excluded_fields=["search_vector"],
+    )
     name = models.CharField(
         max_length=25,
         unique=True,
@@ -93,10 +98,13 @@ class Action(models.Model):
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
     object_id = models.PositiveIntegerField()
     data = GenericForeignKey("content_type", "object_id")
+    # Weighted name, section and description, see actions.search.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = "Action"
         verbose_name_plural = "Actions"
         indexes = [
             models.Index(fields=["content_type", "object_id"]),
+            GinIndex(fields=["search_vector"]),
         ]
@@ -0,0 +1,41 @@
+from django.db import models
+from users.models import User
+
+
+class UserCatalogue(models.Model):
+    """Materialized playable actions catalogue of a user.
+
+    ``version`` is bumped on each invalidation, which also drops the
+    ``payload`` until it is rebuilt (see ``actions.catalogue``).
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="catalogue",
+    )
+    version = models.PositiveBigIntegerField(default=0)
+    payload = models.JSONField(blank=True, null=True)
+    last_update = models.DateTimeField(auto_now=True)
+
+
+class ActionChange(models.Model):
+    """Change log entry of the actions catalogues.
+
+    An entry points either to an action whose content or access changed,
+    or to a user whose whole catalogue may have changed. An entry with
+    both tells that the user may have lost access to the action, and one
+    with neither concerns every catalogue.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    action_id = models.BigIntegerField(blank=True, null=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        blank=True,
+        null=True,
+    )
+    creation_date = models.DateTimeField(auto_now_add=True)
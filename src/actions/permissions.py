@@ -1,7 +1,6 @@
-from django.db.models import Q
 from rest_framework.permissions import BasePermission
 
-from workspaces.models import Workspace
+from users.principal_context import get_principal_context
 
 
 class IsActionWorkspaceMember(BasePermission):
@@ -15,13 +14,7 @@ class IsActionWorkspaceMember(BasePermission):
         if not user or not user.is_authenticated:
             return False
 
-        if not obj.workspace:
+        if obj.workspace_id is None:
             return True
 
-        return Workspace.objects.filter(
-            Q(pk=obj.workspace.id),
-            Q(users=user)
-            | Q(groups__user_set=user)
-            | Q(roles__users=user)
-            | Q(roles__groups__user_set=user),
-        ).exists()
+        return obj.workspace_id in get_principal_context(request).workspace_ids
@@ -0,0 +1,44 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchVector
+
+from actions.models import Action
+
+SEARCHED_FIELDS = ("name", "section", "description")
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def get_action_search_vector() -> SearchVector:
+    """Return the weighted search document of actions.
+
+    Names rank first, then sections, then descriptions.
+    """
+    config = settings.ACTIONS_SEARCH_CONFIG
+    return (
+        SearchVector("name", weight="A", config=config)
+        + SearchVector("section", weight="B", config=config)
+        + SearchVector("description", weight="C", config=config)
+    )
+
+
+def update_action_search_vectors(action_ids=None) -> None:
+    """Refresh the stored search document of the given actions, or of all."""
+    actions = Action.objects.all()
+    if action_ids is not None:
+        actions = actions.filter(pk__in=action_ids)
+    actions.update(search_vector=get_action_search_vector())
+
+
+def build_action_search_query(search: str):
+    """Return a query matching actions containing words starting with each
+    term, or None when the search holds no word.
+    """
+    words = _WORD_PATTERN.findall(search)
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join(f"{word}:*" for word in words),
+        search_type="raw",
+        config=settings.ACTIONS_SEARCH_CONFIG,
+    )
@@ -1,10 +1,21 @@
 import logging
 
 from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 from simple_history.utils import update_change_reason
 
-from _config.services.storage_utils import generate_presigned_url
+from _config.services.eager_loading import (
+    EagerLoadingListSerializer,
+    EagerLoadingMixin,
+)
+from _config.services.image_processing import get_processed_image_key
+from _config.services.storage_utils.serializers import (
+    PresignedURLListSerializer,
+    PresignedURLMixin,
+)
+from actions.action_data_loader import attach_action_data
+from actions.models.action_data_models import get_action_data_model
 from actions.models.action_models import Action, get_thumbnail_base_key
 from users.models import Group, Role, User
 from users.serializers.group_serializers import GroupDetailedSerializer
@@ -19,29 +30,57 @@ from .action_data_version_serializers import action_data_serializers
 logger = logging.getLogger("django")
 
 
-class ActionSerializer(serializers.ModelSerializer):
+class ActionListSerializer(
+    EagerLoadingListSerializer, PresignedURLListSerializer
+):
+    """List serializer resolving actions data, relations and file URLs in
+    bulk.
+    """
+
+    def load_related(self, data):
+        data = super().load_related(data)
+        if self.child.requires_action_data:
+            data = attach_action_data(data)
+        return data
+
+
+class ActionSerializer(
+    EagerLoadingMixin, PresignedURLMixin, serializers.ModelSerializer
+):
     """Serializer for Action model."""
 
     data = serializers.SerializerMethodField()
     thumbnail_url = serializers.SerializerMethodField()
+    requires_action_data = False
 
     def get_data(self, action: Action) -> dict:
-        """Return data type."""
-        return {"type": action.data.type}
+        """Return data type, without loading the data row."""
+        return {"type": get_action_data_model(action.content_type_id).TYPE}
+
+    def get_file_keys(self, action: Action) -> list:
+        if not action.thumbnail:
+            return []
+        return [
+            action.thumbnail  # If it's an historic record
+            if isinstance(action.thumbnail, str)
+            else action.thumbnail.name
+        ]
+
+    def has_shared_file_urls(self, action: Action) -> bool:
+        """Only share the thumbnail URLs of public actions."""
+        return action.is_public
 
     def get_thumbnail_url(self, action: Action) -> str:
         """Return project thumbnail url."""
-        if bool(action.thumbnail):
-            key = (
-                action.thumbnail  # If it's an historic record
-                if isinstance(action.thumbnail, str)
-                else action.thumbnail.name
+        for key in self.get_file_keys(action):
+            return self.get_presigned_url(
+                key, self.has_shared_file_urls(action)
             )
-            return generate_presigned_url(key, self.context["request"])
         return None
 
     class Meta:
         model = Action
+        list_serializer_class = ActionListSerializer
         fields = [
             "id",
             "name",
@@ -101,8 +140,12 @@ class ActionSerializer(serializers.ModelSerializer):
 class ActionPlayableSerializer(ActionSerializer):
     """Serializer for Action model."""
 
+    requires_action_data = True
+
     def get_data(self, action: Action) -> dict:
         """Return action data."""
+        if action.data is None:
+            return None
         serializer = action_data_serializers.get(action.data.type)
         if not serializer:
             return ValueError(f"Data type ${action.data.type} not supported.")
@@ -110,6 +153,7 @@ class ActionPlayableSerializer(ActionSerializer):
 
     class Meta:
         model = Action
+        list_serializer_class = ActionListSerializer
         fields = ActionSerializer.Meta.fields
         read_only_fields = ActionSerializer.Meta.read_only_fields
 
@@ -122,14 +166,11 @@ class ActionDetailedSerializer(ActionPlayableSerializer):
 
         if vars(instance).get("history_id", None):
             user_data = None
-            if instance.history_user_id:
-                try:
-                    user = User.objects.get(pk=instance.history_user_id)
-                    user_data = ShortUserSerializer(
-                        user, context=self.context
-                    ).data
-                except User.DoesNotExist:
-                    user_data = None
+            # history_user is preloaded by the action timeline builder
+            if instance.history_user:
+                user_data = ShortUserSerializer(
+                    instance.history_user, context=self.context
+                ).data
             rep["history"] = {
                 "id": instance.history_id,
                 "user": user_data,
@@ -137,6 +178,26 @@ class ActionDetailedSerializer(ActionPlayableSerializer):
             }
         return rep
 
+    @classmethod
+    def load_timeline_related(cls, versions) -> None:
+        """Load the relations of the historical actions of a timeline.
+
+        Members set by ``build_action_timeline`` are shared between
+        versions, so each one is loaded once for the whole timeline.
+        """
+        prefetch_related_objects(versions, "create_by")
+        members = {
+            "users": [version.create_by for version in versions],
+            "groups": [],
+            "roles": [],
+        }
+        for version in versions:
+            for field_name, instances in members.items():
+                instances.extend(getattr(version, field_name))
+        UserSerializer.load_related(filter(None, members["users"]))
+        GroupDetailedSerializer.load_related(members["groups"])
+        RoleDetailedSerializer.load_related(members["roles"])
+
     create_by = UserSerializer(read_only=True)
     users = UserSerializer(many=True, read_only=True)
     user_ids = serializers.PrimaryKeyRelatedField(
@@ -156,6 +217,7 @@ class ActionDetailedSerializer(ActionPlayableSerializer):
 
     class Meta:
         model = Action
+        list_serializer_class = ActionListSerializer
         fields = ActionSerializer.Meta.fields + [
             "create_by",
             "users",
@@ -217,7 +279,9 @@ class ActionDetailedSerializer(ActionPlayableSerializer):
                             )
                         }
                     )
-                instance.thumbnail.name = new_key
+                instance.thumbnail.name = get_processed_image_key(
+                    instance, "thumbnail", new_key
+                )
             result = serializers.ModelSerializer.update(
                 self, instance, validated_data
             )
@@ -0,0 +1,28 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from actions.action_timeline import decode_edition_cursor
+
+
+class ActionVersionsQuerySerializer(serializers.Serializer):
+    """Serializer for Action versions query params."""
+
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    summary = serializers.BooleanField(required=False, default=False)
+    limit = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=settings.DEFAULT_MAX_PAGE_SIZE,
+        default=settings.DEFAULT_PAGE_SIZE,
+    )
+    cursor = serializers.CharField(required=False, allow_blank=True)
+
+    def validate_cursor(self, value):
+        """Decode cursor position."""
+        if not value:
+            return None
+        try:
+            return decode_edition_cursor(value)
+        except ValueError as error:
+            raise serializers.ValidationError(str(error))
@@ -0,0 +1,14 @@
+from django.conf import settings
+from rest_framework import serializers
+
+
+class PrincipalSearchQuerySerializer(serializers.Serializer):
+    """Serializer for principals search query params."""
+
+    query = serializers.CharField()
+    limit = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        max_value=settings.PRINCIPAL_SEARCH_MAX_LIMIT,
+        default=10,
+    )
@@ -0,0 +1,201 @@
+from django.contrib.contenttypes.models import ContentType
+
+from actions.catalogue import (
+    get_actions_audience,
+    get_principals_audience,
+    invalidate_user_catalogues,
+    record_action_changes,
+    record_action_revocations,
+    record_catalogue_changes,
+)
+from actions.models import Action
+from actions.search import SEARCHED_FIELDS, update_action_search_vectors
+
+
+def capture_action_audience(sender, instance, **kwargs) -> None:
+    """Remember who could see an action before it is saved or deleted."""
+    instance._previous_audience = (
+        get_actions_audience([instance.pk]) if instance.pk else set()
+    )
+    instance._was_active = bool(instance.pk) and (
+        Action.objects.filter(pk=instance.pk, is_active=True).exists()
+    )
+
+
+def invalidate_catalogues_on_action_save(sender, instance, **kwargs) -> None:
+    """Invalidate the catalogues of the users who see a saved action."""
+    previous_audience = getattr(instance, "_previous_audience", None)
+    audience = get_actions_audience([instance.pk])
+    if previous_audience is None or audience is None:
+        invalidate_user_catalogues()
+    else:
+        invalidate_user_catalogues(previous_audience | audience)
+
+
+def invalidate_catalogues_on_action_delete(sender, instance, **kwargs) -> None:
+    """Invalidate the catalogues of the users who saw a deleted action."""
+    invalidate_user_catalogues(getattr(instance, "_previous_audience", None))
+
+
+def invalidate_catalogues_on_action_data_save(
+    sender, instance, created, **kwargs
+) -> None:
+    """Invalidate the catalogues of the users who see an edited action."""
+    if created:
+        return
+    action_ids = Action.objects.filter(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+    ).values_list("id", flat=True)
+    invalidate_user_catalogues(get_actions_audience(action_ids))
+
+
+def invalidate_catalogues_on_action_acl_change(
+    sender, instance, action, reverse, model, pk_set, **kwargs
+) -> None:
+    """Invalidate the catalogues of the users whose action access changed."""
+    if reverse:
+        # The instance is a user, group or role and pk_set holds action ids.
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_user_catalogues(_get_principal_audience(instance))
+        return
+    if action == "pre_clear":
+        instance._cleared_audience = get_actions_audience([instance.pk])
+    elif action == "post_clear":
+        invalidate_user_catalogues(instance._cleared_audience)
+    elif action in ("post_add", "post_remove"):
+        invalidate_user_catalogues(_get_principals_audience(model, pk_set))
+
+
+def invalidate_catalogues_on_principals_change(
+    sender, user_ids, **kwargs
+) -> None:
+    """Invalidate the catalogues of users whose memberships changed."""
+    invalidate_user_catalogues(user_ids)
+
+
+def _get_revoked_audience(instance):
+    """Return who may have lost access to a saved or deleted action, None
+    for anyone.
+    """
+    if not getattr(instance, "_was_active", True):
+        return set()
+    previous_audience = getattr(instance, "_previous_audience", None)
+    audience = (
+        get_actions_audience([instance.pk]) if instance.is_active else set()
+    )
+    if audience is None:
+        return set()
+    if previous_audience is None:
+        return None
+    return previous_audience - audience
+
+
+def _get_principal_audience(principal) -> set:
+    return _get_principals_audience(type(principal), [principal.pk])
+
+
+def _get_principals_audience(model, pk_set) -> set:
+    field_name = model._meta.model_name
+    if field_name == "user":
+        return set(pk_set)
+    return get_principals_audience(**{f"{field_name}_ids": pk_set})
+
+
+def record_change_on_action_save(sender, instance, **kwargs) -> None:
+    """Log the change of a saved or deleted action, and who lost it."""
+    record_action_changes([instance.pk])
+    record_action_revocations([instance.pk], _get_revoked_audience(instance))
+
+
+def record_change_on_action_data_save(
+    sender, instance, created, **kwargs
+) -> None:
+    """Log the change of the action of edited data."""
+    if created:
+        return
+    record_action_changes(
+        Action.objects.filter(
+            content_type=ContentType.objects.get_for_model(instance),
+            object_id=instance.pk,
+        ).values_list("id", flat=True)
+    )
+
+
+def record_change_on_action_acl_change(
+    sender, instance, action, reverse, model, pk_set, **kwargs
+) -> None:
+    """Log the change of actions whose users, groups or roles changed, and
+    who may have lost them.
+    """
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            record_action_changes([instance.pk])
+        if instance.is_public:
+            return
+        if action == "post_remove":
+            record_action_revocations(
+                [instance.pk], _get_principals_audience(model, pk_set)
+            )
+        elif action == "post_clear":
+            # Captured by invalidate_catalogues_on_action_acl_change.
+            record_action_revocations(
+                [instance.pk], getattr(instance, "_cleared_audience", None)
+            )
+        return
+    # The instance is a user, group or role and pk_set holds action ids.
+    if action == "pre_clear":
+        instance._cleared_action_ids = list(
+            instance.actions.values_list("id", flat=True)
+        )
+    elif action == "post_clear":
+        record_action_changes(instance._cleared_action_ids)
+        record_action_revocations(
+            instance._cleared_action_ids, _get_principal_audience(instance)
+        )
+    elif action in ("post_add", "post_remove"):
+        record_action_changes(pk_set)
+        if action == "post_remove":
+            record_action_revocations(pk_set, _get_principal_audience(instance))
+
+
+def capture_actions_on_principal_delete(sender, instance, **kwargs) -> None:
+    """Remember the actions granted to a group or role before it is deleted."""
+    instance._deleted_action_ids = list(
+        instance.actions.values_list("id", flat=True)
+    )
+
+
+def record_change_on_principal_delete(sender, instance, **kwargs) -> None:
+    """Log the change of the actions granted to a deleted group or role.
+
+    The deletion cascades to the grants without sending ``m2m_changed``.
+    """
+    record_action_changes(getattr(instance, "_deleted_action_ids", ()))
+
+
+def record_change_on_principals_change(sender, user_ids, **kwargs) -> None:
+    """Log the change of the catalogues of users whose memberships changed."""
+    record_catalogue_changes(user_ids)
+
+
+def refresh_catalogues_on_thumbnail_processed(
+    sender, field_name, pks, **kwargs
+) -> None:
+    """Invalidate and log the actions whose raw thumbnail was replaced.
+
+    Records are switched without being saved, while catalogues store the
+    thumbnail keys.
+    """
+    if field_name != "thumbnail":
+        return
+    invalidate_user_catalogues(get_actions_audience(pks))
+    record_action_changes(pks)
+
+
+def update_search_vector_on_action_save(
+    sender, instance, update_fields, **kwargs
+) -> None:
+    """Refresh the search document of an action when its text changed."""
+    if update_fields is None or set(update_fields) & set(SEARCHED_FIELDS):
+        update_action_search_vectors([instance.pk])
@@ -1,17 +1,22 @@
-import mimetypes
 from http import HTTPMethod
 
 from django.core.exceptions import ValidationError
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
-from django.http import FileResponse, Http404
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from _config.permissions import IsFileAuthenticated
-from _config.services.storage_utils import generate_presigned_url
+from _config.services.image_processing import (
+    create_image_upload,
+    finalize_image_upload,
+    is_raw_image_key,
+    save_image_upload,
+)
+from _config.services.storage_utils import (
+    generate_presigned_url,
+    get_file_response,
+)
 from actions.models.action_models import generate_thumbnail_path
 from actions.serializers.action_thumbnail_serializer import (
     ActionThumbnailSerializer,
@@ -34,24 +39,22 @@ class ActionThumbnailMixin:
         key = generate_thumbnail_path(
             thumbnail_action, filename, uuid_value=filename.split(".")[0]
         )
-        if request.file_key and request.file_key != key:
+        # Only set when authenticated by a file token.
+        file_key = getattr(request, "file_key", None)
+        if file_key and file_key != key:
             raise ValidationError("Invalid file key provided.")
 
+        file_obj = None
         if thumbnail_action.thumbnail.name == key:
             file_obj = thumbnail_action.thumbnail
-            content_type = (
-                mimetypes.guess_type(thumbnail_action.thumbnail.name)[0]
-                or "application/octet-stream"
-            )
-        else:
-            try:
-                file_obj = default_storage.open(key, "rb")
-            except FileNotFoundError:
-                raise Http404("Thumbnail not found")
-            content_type = (
-                mimetypes.guess_type(key)[0] or "application/octet-stream"
-            )
-        return FileResponse(file_obj, content_type=content_type)
+        return get_file_response(
+            request,
+            key,
+            file_obj,
+            immutable=not is_raw_image_key(key),
+            shared=thumbnail_action.is_public,
+            image_variants=True,
+        )
 
     @action(
         detail=True,
@@ -62,16 +65,58 @@ class ActionThumbnailMixin:
     )
     def set_thumbnail(self, request, pk=None):
         """Set action thumbnail."""
-        # TODO: Manage unreferenced old thumbnails cleanup
+        # Replaced and unused thumbnails are deleted by the
+        # collect_orphaned_uploads command.
         obj = self.get_object()
         serializer = ActionThumbnailSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         thumbnail_file = serializer.validated_data["thumbnail"]
-        key = generate_thumbnail_path(obj, thumbnail_file.name)
-        default_storage.save(key, ContentFile(thumbnail_file.read()))
+        key = save_image_upload(obj, "thumbnail", thumbnail_file, attach=False)
+        return Response(
+            {
+                "url": generate_presigned_url(
+                    key, request, shared=obj.is_public
+                ),
+                "key": key,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(
+        detail=True,
+        methods=[HTTPMethod.POST],
+        url_name="thumbnail-upload",
+        url_path="thumbnail-upload",
+    )
+    def create_thumbnail_upload(self, request, pk=None):
+        """Get a URL to upload a thumbnail directly to storage."""
+        return Response(
+            create_image_upload(
+                self.get_object(),
+                "thumbnail",
+                request.data.get("content_type"),
+                ActionThumbnailSerializer.PICTURE_MAX_SIZE_MB * 1024 * 1024,
+                request,
+            )
+        )
+
+    @action(
+        detail=True,
+        methods=[HTTPMethod.POST],
+        url_name="thumbnail-upload-finalize",
+        url_path="thumbnail-upload/finalize",
+    )
+    def finalize_thumbnail_upload(self, request, pk=None):
+        """Check a thumbnail uploaded to storage, like ``set_thumbnail``."""
+        obj = self.get_object()
+        key = finalize_image_upload(
+            obj, "thumbnail", request.data.get("token"), attach=False
+        )
         return Response(
             {
-                "url": generate_presigned_url(key, request),
+                "url": generate_presigned_url(
+                    key, request, shared=obj.is_public
+                ),
                 "key": key,
             },
             status=status.HTTP_200_OK,
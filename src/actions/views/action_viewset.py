@@ -1,6 +1,12 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from actions.filters import ActionFilter, ActionSearchFilter
 from actions.permissions import IsActionWorkspaceMember
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
-from django.db.models import Q, Exists, OuterRef
+from django.db.models import Q
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
@@ -8,9 +14,10 @@ from users.permissions import IsActionManager
 from users.serializers.user_serializers import UserSerializer
 from users.serializers.group_serializers import GroupDetailedSerializer
 from users.serializers.role_serializers import RoleDetailedSerializer
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.filters import OrderingFilter
 from actions.models.action_models import Action
-from users.models import User, Group, Role
+from users.principal_context import get_principal_context
+from users.principal_search import search_principals
 from actions.serializers.action_data_version_serializers import action_data_serializers
 from actions.serializers.action_serializers import (
     ActionSerializer,
@@ -18,21 +25,41 @@ from actions.serializers.action_serializers import (
     ActionPlayableSerializer,
 )
 from system.models import SystemInfo
-from rest_framework.pagination import PageNumberPagination
-from workspaces.models import Workspace
+from actions.catalogue import (
+    get_catalogue_changes,
+    get_user_catalogue,
+    get_user_playable_actions,
+)
+from actions.action_timeline import (
+    build_action_timeline,
+    encode_edition_cursor,
+    get_action_editions,
+    get_edition_number,
+    get_editions_after,
+)
+from actions.serializers.action_versions_serializer import (
+    ActionVersionsQuerySerializer,
+)
+from actions.serializers.principal_search_serializer import (
+    PrincipalSearchQuerySerializer,
+)
+from rest_framework.utils.urls import replace_query_param
+from _config.services.pagination import EstimatedCountPagination
 from .action_thumbnail_viewset import ActionThumbnailMixin
 
 
-class ActionPagination(PageNumberPagination):
+class ActionPagination(EstimatedCountPagination):
     page_size = 25
     page_size_query_param = "limit"
     max_page_size = 1000
+    count_collections = ("actions", "workspaces", "principals")
 
 
 class ActionViewSet(viewsets.ModelViewSet, ActionThumbnailMixin):
     model = Action
     permission_classes = [IsAuthenticated, IsActionManager, IsActionWorkspaceMember]
-    filter_backends = [OrderingFilter, SearchFilter]
+    filter_backends = [OrderingFilter, ActionSearchFilter, DjangoFilterBackend]
+    filterset_class = ActionFilter
     pagination_class = ActionPagination
     ordering_fields = [
         "name",
@@ -49,21 +76,12 @@ class ActionViewSet(viewsets.ModelViewSet, ActionThumbnailMixin):
             or not SystemInfo.get_instance().allow_action_workspaces
         ):
             return Action.objects.all()
-        user = self.request.user
-        manager_workspaces = Workspace.objects.filter(
-            Q(users=user)
-            | Q(groups__user_set=user)
-            | Q(roles__users=user)
-            | Q(roles__groups__user_set=user),
-            id=OuterRef("workspace_id"),
-        )
+        workspace_ids = get_principal_context(self.request).workspace_ids
         qs = (
             Action.objects.filter(
-                Q(workspace__isnull=True) | Exists(manager_workspaces)
+                Q(workspace__isnull=True) | Q(workspace_id__in=workspace_ids)
             )
-            .distinct()
             .select_related("workspace")
-            .prefetch_related("users", "groups", "roles__users", "roles__groups")
         )
         return qs
 
@@ -77,6 +95,14 @@ class ActionViewSet(viewsets.ModelViewSet, ActionThumbnailMixin):
 
     @action(methods=["get"], detail=False, permission_classes=[IsAuthenticated])
     def mine(self, request):
+        if not any(
+            param in request.query_params
+            for param in ("search", "ordering", "type")
+        ):
+            catalogue, version = get_user_catalogue(request.user, request)
+            return Response(
+                catalogue, headers={"X-Catalogue-Version": str(version)}
+            )
         actions = self.get_user_active_actions(request.user)
         return Response(
             ActionPlayableSerializer(
@@ -84,104 +110,112 @@ class ActionViewSet(viewsets.ModelViewSet, ActionThumbnailMixin):
             ).data
         )
 
-    @action(methods=["get"], detail=False, permission_classes=[IsAuthenticated])
-    def search(self, request):
-        search_term = request.query_params.get("query")
-        limit = request.query_params.get("limit", 10)
-        if not search_term:
-            return Response({"error": "query param is required."}, status=400)
-        terms = search_term.split()
-        users_search_query = Q()
-        groups_search_query = Q()
-        roles_search_query = Q()
-        for term in terms:
-            users_search_query &= (
-                Q(username__icontains=term)
-                | Q(email__icontains=term)
-                | Q(first_name__icontains=term)
-                | Q(last_name__icontains=term)
-            )
-            groups_search_query &= Q(name__icontains=term)
-            roles_search_query &= Q(name__icontains=term) | Q(
-                description__icontains=term
+    @action(
+        methods=["get"],
+        detail=False,
+        permission_classes=[IsAuthenticated],
+        url_path="mine/changes",
+        url_name="mine-changes",
+    )
+    def mine_changes(self, request):
+        """List the changes of the user catalogue since a sync token."""
+        return Response(
+            get_catalogue_changes(
+                request.user, request.query_params.get("since"), request
             )
-        users = User.objects.filter(users_search_query).distinct()[:limit]
-        groups = Group.objects.filter(groups_search_query).distinct()[:limit]
-        roles = Role.objects.filter(roles_search_query).distinct()[:limit]
-
-        user_serializer = UserSerializer(users, many=True)
-        group_serializer = GroupDetailedSerializer(groups, many=True)
-        role_serializer = RoleDetailedSerializer(roles, many=True)
+        )
 
-        return Response(
-            {
-                "users": user_serializer.data,
-                "groups": group_serializer.data,
-                "roles": role_serializer.data,
-            }
+    @action(methods=["get"], detail=False, permission_classes=[IsAuthenticated])
+    def search(self, request):
+        """Search the users, groups and roles to share actions with."""
+        query = PrincipalSearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        search = " ".join(params["query"].lower().split())
+        cache_key = "actions:principal-search:{}:{}:{}".format(
+            request.user.pk,
+            params["limit"],
+            hashlib.sha256(search.encode()).hexdigest(),
         )
+        results = cache.get(cache_key)
+        if results is None:
+            principals = search_principals(search, params["limit"])
+            results = {
+                "users": UserSerializer(principals["users"], many=True).data,
+                "groups": GroupDetailedSerializer(
+                    principals["groups"], many=True
+                ).data,
+                "roles": RoleDetailedSerializer(
+                    principals["roles"], many=True
+                ).data,
+            }
+            cache.set(
+                cache_key, results, settings.PRINCIPAL_SEARCH_CACHE_SECONDS
+            )
+        return Response(results)
 
     @action(methods=["get"], detail=True, permission_classes=[IsAuthenticated])
     def versions(self, request, pk=None):
+        """List action editions, newest first.
+
+        Editions are paginated by cursor when ``cursor`` or ``limit`` is
+        given, and ``summary=true`` omits their data.
+        """
         action_obj = self.get_object()
-        action_versions = action_obj.history.order_by("history_date")
+        query = ActionVersionsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        paginated = any(
+            param in request.query_params for param in ("cursor", "limit")
+        )
+
+        editions = get_action_editions(
+            action_obj, params.get("since"), params.get("until")
+        )
+        has_next = False
+        if paginated:
+            if params.get("cursor"):
+                editions = get_editions_after(editions, params["cursor"])
+            editions = list(editions[: params["limit"] + 1])
+            has_next = len(editions) > params["limit"]
+            editions = editions[: params["limit"]]
+        timeline = build_action_timeline(
+            editions, with_data=not params["summary"]
+        )
+        ActionDetailedSerializer.load_timeline_related(timeline)
 
         versions = []
-        version_count = 0
-        for action_version in action_versions:
-            action_version.data = action_obj.data.history.as_of(
-                action_version.history_date
-            )
-            if not action_version.history_change_reason:
-                continue
-            version_count += 1
-
-            users = []
-            for user in action_version.users.all():
-                try:
-                    users.append(User.objects.get(pk=user.user_id))
-                except User.DoesNotExist:
-                    pass
-            action_version.users = users
-
-            groups = []
-            for group in action_version.groups.all():
-                try:
-                    groups.append(Group.objects.get(pk=group.group_id))
-                except Group.DoesNotExist:
-                    pass
-            action_version.groups = groups
-
-            roles = []
-            for role in action_version.roles.all():
-                try:
-                    roles.append(Role.objects.get(pk=role.role_id))
-                except Role.DoesNotExist:
-                    pass
-            action_version.roles = roles
+        oldest_number = (
+            get_edition_number(action_obj, timeline[-1]) if timeline else 0
+        )
+        for index, action_version in enumerate(timeline):
             serializer = ActionDetailedSerializer(
                 action_version, context={"request": request}
             )
             data = serializer.data
+            if params["summary"]:
+                data.pop("data")
             if data.get("history"):
-                data["history"]["number"] = version_count
+                data["history"]["number"] = (
+                    oldest_number + len(timeline) - 1 - index
+                )
             versions.append(data)
-        versions.reverse()
-        return Response(versions)
+        if not paginated:
+            return Response(versions)
+        return Response(
+            {
+                "next": (
+                    replace_query_param(
+                        request.build_absolute_uri(),
+                        "cursor",
+                        encode_edition_cursor(timeline[-1]),
+                    )
+                    if has_next
+                    else None
+                ),
+                "results": versions,
+            }
+        )
 
     def get_user_active_actions(self, user):
-        queryset = (
-            Action.objects.filter(is_active=True)
-            .filter(
-                Q(users=user)  # Actions linked to user
-                | Q(groups__user_set=user)  # Actions linked to user via group
-                | Q(roles__users=user)  # Actions linked to user via role
-                | Q(
-                    roles__groups__user_set=user
-                )  # Actions linked to user via role group
-                | Q(is_public=True)  # Actions marked as public
-            )
-            .distinct()
-            .prefetch_related("users", "groups", "roles__users", "roles__groups")
-        )
-        return self.filter_queryset(queryset)
+        return self.filter_queryset(get_user_playable_actions(user))
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import re
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django_user_agents.utils import get_user_agent
+from rest_framework.exceptions import AuthenticationFailed
+
+from actions.catalogue_events import catalogue_event_hub
+from auths.jwt.jwt_utils import JwtCookiesAuthentication
+
+CATALOGUE_EVENTS_PATH = "/v1/actions/mine/events"
+
+
+async def catalogue_events_app(scope, receive, send):
+    """Stream a server-sent event each time the user catalogue changes.
+
+    Events carry no data: clients fetch the changes from
+    ``actions/mine/changes``. Changes are batched for
+    ``ACTION_CHANGES_SETTLE_SECONDS`` so that they are visible once the
+    event is received.
+
+    Served as a raw ASGI application, next to Django's one, so that the
+    stream ends as soon as the client disconnects and holds neither a
+    thread nor a database connection while open.
+    """
+    headers = _get_cors_headers(scope)
+    if scope["method"] != "GET":
+        await _send_json(send, 405, {"detail": "Method not allowed."}, headers)
+        return
+    try:
+        user_id = await sync_to_async(_authenticate, thread_sensitive=False)(
+            scope
+        )
+    except AuthenticationFailed as error:
+        await _send_json(send, 401, {"detail": str(error.detail)}, headers)
+        return
+    if user_id is None:
+        await _send_json(
+            send,
+            401,
+            {"detail": "Authentication credentials were not provided."},
+            headers,
+        )
+        return
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+                *headers,
+            ],
+        }
+    )
+    queue = catalogue_event_hub.connect(user_id)
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        await _send_event(send, f"retry: {settings.CATALOGUE_EVENTS_RETRY_MS}")
+        while True:
+            change = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {change, disconnected},
+                timeout=settings.CATALOGUE_EVENTS_HEARTBEAT_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if change not in done:
+                change.cancel()
+            if disconnected in done:
+                return
+            if change not in done:
+                await _send_event(send, ": heartbeat")
+                continue
+            await asyncio.wait(
+                {disconnected}, timeout=settings.ACTION_CHANGES_SETTLE_SECONDS
+            )
+            if disconnected.done():
+                return
+            if not queue.empty():
+                queue.get_nowait()
+            await _send_event(send, "event: catalogue\ndata: {}")
+    finally:
+        disconnected.cancel()
+        catalogue_event_hub.disconnect(user_id, queue)
+
+
+def _authenticate(scope):
+    """Return the id of the user of a request, None if anonymous."""
+    request = ASGIRequest(scope, BytesIO())
+    request.user_agent = get_user_agent(request)
+    try:
+        authentication = JwtCookiesAuthentication().authenticate(request)
+    finally:
+        # Streams are long-lived: do not keep the connection meanwhile.
+        close_old_connections()
+    return authentication[0].pk if authentication else None
+
+
+async def _wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _send_event(send, event: str):
+    await send(
+        {
+            "type": "http.response.body",
+            "body": f"{event}\n\n".encode(),
+            "more_body": True,
+        }
+    )
+
+
+async def _send_json(send, status: int, data: dict, headers: list):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), *headers],
+        }
+    )
+    await send(
+        {"type": "http.response.body", "body": json.dumps(data).encode()}
+    )
+
+
+def _get_cors_headers(scope) -> list:
+    """Return the CORS headers ``CorsMiddleware`` would add."""
+    origin = dict(scope["headers"]).get(b"origin", b"").decode("latin-1")
+    if not origin or not any(
+        re.match(pattern, origin)
+        for pattern in settings.CORS_ALLOWED_ORIGIN_REGEXES
+    ):
+        return []
+    headers = [(b"access-control-allow-origin", origin.encode("latin-1"))]
+    if settings.CORS_ALLOW_CREDENTIALS:
+        headers.append((b"access-control-allow-credentials", b"true"))
+    return headers
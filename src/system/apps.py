@@ -4,7 +4,7 @@ from django.db.models.signals import post_migrate
 
 def create_system_info(sender, **kwargs):
     from .models import SystemInfo
-    SystemInfo.get_instance()
+    SystemInfo.get_instance(cached=False)
 
 
 class SystemConfig(AppConfig):
@@ -12,4 +12,8 @@ class SystemConfig(AppConfig):
     name = "system"
 
     def ready(self):
-        post_migrate.connect(create_system_info, sender=self)
\ No newline at end of file
+        from _config.services.image_processing import image_upload_processed
+        from system.signals import invalidate_singleton_on_image_processed
+
+        post_migrate.connect(create_system_info, sender=self)
+        image_upload_processed.connect(invalidate_singleton_on_image_processed)
\ No newline at end of file
@@ -0,0 +1,58 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from system.models import CollectionVersion
+
+
+def bump_collection_versions(*names) -> None:
+    """Bump the version of collections once the transaction commits."""
+
+    def bump():
+        for name in names:
+            if not CollectionVersion.objects.filter(name=name).update(
+                version=F("version") + 1
+            ):
+                CollectionVersion.objects.bulk_create(
+                    [CollectionVersion(name=name, version=1)],
+                    ignore_conflicts=True,
+                )
+
+    transaction.on_commit(bump)
+
+
+def get_collection_versions(names) -> dict:
+    """Return the current version of collections, by name."""
+    versions = dict.fromkeys(names, 0)
+    versions.update(
+        CollectionVersion.objects.filter(name__in=names).values_list(
+            "name", "version"
+        )
+    )
+    return versions
+
+
+def track_collection(name: str, models=(), through_models=()) -> None:
+    """Bump a collection version whenever rows of its models, or of their
+    many-to-many relations, change.
+    """
+
+    def on_change(sender, **kwargs):
+        if kwargs.get("action", "post_").startswith("post_"):
+            bump_collection_versions(name)
+
+    for model in models:
+        for signal in (post_save, post_delete):
+            signal.connect(
+                on_change,
+                sender=model,
+                weak=False,
+                dispatch_uid=f"collection-{name}-{model._meta.label}",
+            )
+    for through in through_models:
+        m2m_changed.connect(
+            on_change,
+            sender=through,
+            weak=False,
+            dispatch_uid=f"collection-{name}-{through._meta.label}",
+        )
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from _config.services.storage_utils.orphaned_uploads import (
+    delete_stored_files,
+    get_referenced_file_keys,
+    get_referenced_stems,
+    is_referenced,
+    iter_stored_files,
+)
+from actions.models import UserCatalogue
+
+# Storage prefixes of the uploaded files, see the upload_to of the models.
+UPLOAD_PREFIXES = (
+    "users/profile_pictures/",
+    "v1/user-preferences/",
+    "v1/actions/",
+    "v1/system-info/",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the uploaded files no record nor history entry references "
+        "anymore, once older than ORPHANED_UPLOADS_GRACE_HOURS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=int,
+            default=settings.ORPHANED_UPLOADS_GRACE_HOURS,
+            help="Only delete files older than this many hours.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the files to delete without deleting them.",
+        )
+
+    def handle(self, *args, **options):
+        # Taken before references are read, so files uploaded meanwhile are
+        # too recent to be deleted.
+        cutoff = timezone.now() - timedelta(hours=options["grace_hours"])
+        file_keys = get_referenced_file_keys()
+        # Materialized catalogues keep the thumbnail keys they were built
+        # with until rebuilt.
+        for payload in UserCatalogue.objects.exclude(
+            payload__isnull=True
+        ).values_list("payload", flat=True):
+            file_keys.update(
+                item["thumbnail_url"]
+                for item in payload
+                if item.get("thumbnail_url")
+            )
+        referenced_stems = get_referenced_stems(file_keys)
+
+        orphaned_keys = [
+            file_key
+            for prefix in UPLOAD_PREFIXES
+            for file_key, modified in iter_stored_files(prefix)
+            if modified < cutoff
+            and not is_referenced(file_key, referenced_stems)
+        ]
+        if options["dry_run"]:
+            for file_key in orphaned_keys:
+                self.stdout.write(file_key)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{len(orphaned_keys)} orphaned files would be deleted."
+                )
+            )
+            return
+        delete_stored_files(orphaned_keys)
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(orphaned_keys)} orphaned files deleted.")
+        )
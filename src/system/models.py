@@ -1,9 +1,16 @@
+import copy
 import uuid
 
 from django.conf import settings
 from django.db import models
 from django_resized import ResizedImageField
 
+from _config.services.process_cache import ProcessCache
+
+singleton_cache = ProcessCache(
+    "singletons", ttl=settings.SINGLETON_CACHE_SECONDS
+)
+
 
 class SingletonModel(models.Model):
     class Meta:
@@ -12,14 +19,25 @@ class SingletonModel(models.Model):
     def save(self, *args, **kwargs):
         self.pk = 1
         super().save(*args, **kwargs)
+        singleton_cache.invalidate(self._meta.label)
 
     def delete(self, *args, **kwargs):
         pass
 
     @classmethod
-    def get_instance(cls):
-        obj, _ = cls.objects.get_or_create(pk=1)
-        return obj
+    def get_instance(cls, cached=True):
+        """Return the instance, from the process cache unless ``cached`` is
+        False, e.g. before updating it.
+        """
+        if not cached:
+            obj, _ = cls.objects.get_or_create(pk=1)
+            return obj
+        # Callers get their own copy, the cached one must not be mutated.
+        return copy.copy(
+            singleton_cache.get(
+                cls._meta.label, lambda: cls.get_instance(cached=False)
+            )
+        )
 
 
 def generate_default_background_path(instance, filename, uuid_value=None):
@@ -51,3 +69,13 @@ class SystemInfo(SingletonModel):
 
     allow_action_sections = models.BooleanField(default=False)
     allow_users_to_hide_actions = models.BooleanField(default=False)
+
+
+class CollectionVersion(models.Model):
+    """Version stamp of a collection, bumped on each of its changes.
+
+    Used to key the cached counts of paginated lists.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
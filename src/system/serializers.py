@@ -25,7 +25,9 @@ class SystemInfoSerializer(serializers.ModelSerializer):
         """Return system default background image url."""
         if bool(obj.default_background_image):
             return generate_presigned_url(
-                obj.default_background_image.name, self.context["request"]
+                obj.default_background_image.name,
+                self.context["request"],
+                shared=True,
             )
         return None
 
@@ -0,0 +1,7 @@
+from system.models import SingletonModel, singleton_cache
+
+
+def invalidate_singleton_on_image_processed(sender, **kwargs) -> None:
+    """Drop cached singletons whose image was switched by an update."""
+    if issubclass(sender, SingletonModel):
+        singleton_cache.invalidate(sender._meta.label)
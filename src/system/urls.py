@@ -2,12 +2,22 @@ from django.urls import path
 from .views import (
     SystemInfoView,
     SystemDefaultBackgroundView,
+    SystemDefaultBackgroundUploadView,
+    SystemDefaultBackgroundUploadFinalizeView,
     system_default_background_file,
 )
 
 urlpatterns = [
     path("system-info", SystemInfoView.as_view(), name="system-info"),
     path("system-info/default-background", SystemDefaultBackgroundView.as_view()),
+    path(
+        "system-info/default-background-upload",
+        SystemDefaultBackgroundUploadView.as_view(),
+    ),
+    path(
+        "system-info/default-background-upload/finalize",
+        SystemDefaultBackgroundUploadFinalizeView.as_view(),
+    ),
     path(
         "system-info/default-background/<str:filename>",
         system_default_background_file,
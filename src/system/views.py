@@ -1,7 +1,4 @@
-import mimetypes
-
 from django.core.exceptions import ValidationError
-from django.http import FileResponse
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -9,7 +6,16 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from _config.permissions import IsFileAuthenticated
-from _config.services.storage_utils import generate_presigned_url
+from _config.services.image_processing import (
+    create_image_upload,
+    finalize_image_upload,
+    is_raw_image_key,
+    save_image_upload,
+)
+from _config.services.storage_utils import (
+    generate_presigned_url,
+    get_file_response,
+)
 from users.permissions import IsAdmin
 
 from .models import SystemInfo
@@ -37,7 +43,7 @@ class SystemInfoView(APIView):
         return Response(serializer.data)
 
     def patch(self, request):
-        system_info = SystemInfo.get_instance()
+        system_info = SystemInfo.get_instance(cached=False)
         serializer = SystemInfoSerializer(
             system_info,
             data=request.data,
@@ -58,17 +64,19 @@ class SystemInfoView(APIView):
 def system_default_background_file(request, pk=None, filename=None):
     """Get system default background."""
     system_info = SystemInfo.get_instance()
-    if (
-        request.file_key
-        and request.file_key != system_info.default_background_image.name
-    ):
+    # Only set when authenticated by a file token.
+    file_key = getattr(request, "file_key", None)
+    if file_key and file_key != system_info.default_background_image.name:
         raise ValidationError("Invalid file key provided.")
-    content_type = (
-        mimetypes.guess_type(system_info.default_background_image.name)[0]
-        or "application/octet-stream"
-    )
-    return FileResponse(
-        system_info.default_background_image, content_type=content_type
+    return get_file_response(
+        request,
+        system_info.default_background_image.name,
+        system_info.default_background_image,
+        immutable=not is_raw_image_key(
+            system_info.default_background_image.name
+        ),
+        shared=True,
+        image_variants=True,
     )
 
 
@@ -76,29 +84,67 @@ class SystemDefaultBackgroundView(APIView):
     permission_classes = [IsAuthenticated | IsFileAuthenticated, IsAdmin]
 
     def put(self, request):
-        system_info = SystemInfo.get_instance()
+        system_info = SystemInfo.get_instance(cached=False)
         serializer = SystemInfoDefaultBackgroundImageSerializer(
             data=request.data
         )
         serializer.is_valid(raise_exception=True)
-        system_info.default_background_image = serializer.validated_data[
-            "default_background_image"
-        ]
-        system_info.save()
-        return Response(
-            {
-                "default_background_image_url": generate_presigned_url(
-                    system_info.default_background_image.name,
-                    request,
-                )
-            }
+        save_image_upload(
+            system_info,
+            "default_background_image",
+            serializer.validated_data["default_background_image"],
         )
+        return get_default_background_response(request, system_info)
 
     def delete(self, request):
-        system_info = SystemInfo.get_instance()
+        system_info = SystemInfo.get_instance(cached=False)
         system_info.default_background_image.delete()
         system_info.save()
         return Response(
             "Default background image deleted.",
             status=status.HTTP_204_NO_CONTENT,
         )
+
+
+class SystemDefaultBackgroundUploadView(APIView):
+    """Upload the default background image directly to storage."""
+
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request):
+        return Response(
+            create_image_upload(
+                SystemInfo.get_instance(cached=False),
+                "default_background_image",
+                request.data.get("content_type"),
+                SystemInfoDefaultBackgroundImageSerializer.PICTURE_MAX_SIZE_MB
+                * 1024
+                * 1024,
+                request,
+            )
+        )
+
+
+class SystemDefaultBackgroundUploadFinalizeView(APIView):
+    """Set the default background image uploaded to storage."""
+
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request):
+        system_info = SystemInfo.get_instance(cached=False)
+        finalize_image_upload(
+            system_info, "default_background_image", request.data.get("token")
+        )
+        return get_default_background_response(request, system_info)
+
+
+def get_default_background_response(request, system_info):
+    return Response(
+        {
+            "default_background_image_url": generate_presigned_url(
+                system_info.default_background_image.name,
+                request,
+                shared=True,
+            )
+        }
+    )
@@ -1,5 +1,11 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_migrate
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_delete,
+)
 
 
 class UsersConfig(AppConfig):
@@ -7,6 +13,41 @@ class UsersConfig(AppConfig):
     name = "users"
 
     def ready(self):
-        from users.signals import create_default_user
+        from system.collection_versions import track_collection
+        from users.models import Group, Role, User
+        from users.signals import (
+            capture_principals_on_group_delete,
+            capture_principals_on_role_delete,
+            create_default_user,
+            invalidate_admin_group_on_group_change,
+            refresh_principals_on_group_delete,
+            refresh_principals_on_role_delete,
+            refresh_principals_on_role_groups_change,
+            refresh_principals_on_role_users_change,
+            refresh_principals_on_user_groups_change,
+            track_principals_collection,
+        )
+        from users.principals import user_principals_changed
 
         post_migrate.connect(create_default_user, sender=self)
+        m2m_changed.connect(
+            refresh_principals_on_user_groups_change,
+            sender=User.groups.through,
+        )
+        m2m_changed.connect(
+            refresh_principals_on_role_users_change, sender=Role.users.through
+        )
+        m2m_changed.connect(
+            refresh_principals_on_role_groups_change,
+            sender=Role.groups.through,
+        )
+        pre_delete.connect(capture_principals_on_group_delete, sender=Group)
+        post_delete.connect(refresh_principals_on_group_delete, sender=Group)
+        pre_delete.connect(capture_principals_on_role_delete, sender=Role)
+        post_delete.connect(refresh_principals_on_role_delete, sender=Role)
+        post_save.connect(invalidate_admin_group_on_group_change, sender=Group)
+        post_delete.connect(
+            invalidate_admin_group_on_group_change, sender=Group
+        )
+        track_collection("users", models=[User])
+        user_principals_changed.connect(track_principals_collection)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from users.principals import refresh_user_principals
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the user principals closure from group and role "
+        "memberships, repairing any drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            type=int,
+            dest="user_ids",
+            help="Only rebuild the principals of this user id (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        count = refresh_user_principals(options["user_ids"])
+        self.stdout.write(
+            self.style.SUCCESS(f"{count} user principals rebuilt.")
+        )
@@ -0,0 +1,113 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_user_principals(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    Role = apps.get_model("users", "Role")
+    UserPrincipal = apps.get_model("users", "UserPrincipal")
+    rows = set()
+    role_ids_by_group = {}
+    for group_id, role_id in Role.groups.through.objects.values_list(
+        "group_id", "role_id"
+    ):
+        role_ids_by_group.setdefault(group_id, set()).add(role_id)
+    for user_id, group_id in User.groups.through.objects.values_list(
+        "user_id", "group_id"
+    ):
+        rows.add((user_id, group_id, None))
+        for role_id in role_ids_by_group.get(group_id, ()):
+            rows.add((user_id, None, role_id))
+    for user_id, role_id in Role.users.through.objects.values_list(
+        "user_id", "role_id"
+    ):
+        rows.add((user_id, None, role_id))
+    UserPrincipal.objects.bulk_create(
+        [
+            UserPrincipal(user_id=user_id, group_id=group_id, role_id=role_id)
+            for user_id, group_id, role_id in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0006_alter_userpreferences_custom_background_image"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserPrincipal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "group",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="users.group",
+                    ),
+                ),
+                (
+                    "role",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="users.role",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="principals",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="userprincipal",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    models.Q(("group__isnull", False), ("role__isnull", True)),
+                    models.Q(("group__isnull", True), ("role__isnull", False)),
+                    _connector="OR",
+                ),
+                name="user_principal_group_or_role",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="userprincipal",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("group__isnull", False)),
+                fields=("user", "group"),
+                name="unique_user_principal_group",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="userprincipal",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("role__isnull", False)),
+                fields=("user", "role"),
+                name="unique_user_principal_role",
+            ),
+        ),
+        migrations.RunPython(build_user_principals, migrations.RunPython.noop),
+    ]
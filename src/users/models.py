@@ -2,23 +2,58 @@ import uuid
 
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import PermissionDenied
 from django.core.validators import MinLengthValidator
 from django.db import models
+from django.db.models.functions import Cast, Upper
 from django.db.models.signals import post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from django_group_model.models import AbstractGroup
 from django_resized import ResizedImageField
 from django_scim.models import AbstractSCIMGroupMixin, AbstractSCIMUserMixin
 
+from _config.services.process_cache import ProcessCache
+
+group_cache = ProcessCache("groups", ttl=settings.ADMIN_GROUP_CACHE_SECONDS)
+
+
+def trigram_index(field_name: str, name: str) -> GinIndex:
+    """Return a trigram index serving case-insensitive substring lookups.
+
+    The indexed expression matches the one of ``icontains`` lookups.
+    """
+    return GinIndex(
+        OpClass(
+            Upper(Cast(field_name, output_field=models.TextField())),
+            name="gin_trgm_ops",
+        ),
+        name=name,
+    )
+
 
 class Group(AbstractSCIMGroupMixin, AbstractGroup):
-    pass
+    class Meta(AbstractGroup.Meta):
+        indexes = [trigram_index("name", "users_group_name_trgm")]
+
+
+def get_admin_group_id():
+    """Return the id of the ADMIN_GROUP group, if any, from the process
+    cache. It is invalidated when groups are saved or deleted.
+    """
+    if not settings.ADMIN_GROUP:
+        return None
+    return group_cache.get(
+        "admin-group-id",
+        lambda: Group.objects.filter(name=settings.ADMIN_GROUP)
+        .values_list("id", flat=True)
+        .first(),
+    )
 
 
 def generate_profile_picture_path(self, filename):
     """Generate the upload path for the thumbnail"""
-    return f"users/profile_pictures/{str(uuid.uuid4())}.${self.PROFILE_FORMAT.lower()}"
+    return f"users/profile_pictures/{str(uuid.uuid4())}.{self.PROFILE_FORMAT.lower()}"
 
 
 class User(AbstractSCIMUserMixin, AbstractUser):
@@ -78,10 +113,11 @@ class User(AbstractSCIMUserMixin, AbstractUser):
     @property
     def is_superuser_group_member(self):
         if settings.ADMIN_GROUP and settings.SCIM_ENABLED:
-            superadmin_group = Group.objects.filter(
-                name=settings.ADMIN_GROUP
-            ).first()
-            if superadmin_group and superadmin_group in self.groups.all():
+            admin_group_id = get_admin_group_id()
+            # Iterate so that prefetched groups are used.
+            if admin_group_id is not None and any(
+                group.pk == admin_group_id for group in self.groups.all()
+            ):
                 return True
         return False
 
@@ -105,6 +141,12 @@ class User(AbstractSCIMUserMixin, AbstractUser):
     class Meta:
         verbose_name = "User"
         verbose_name_plural = "Users"
+        indexes = [
+            trigram_index("username", "users_user_username_trgm"),
+            trigram_index("email", "users_user_email_trgm"),
+            trigram_index("first_name", "users_user_first_name_trgm"),
+            trigram_index("last_name", "users_user_last_name_trgm"),
+        ]
 
 
 @receiver(pre_delete, sender=User)
@@ -166,6 +208,57 @@ class Role(models.Model):
         User, on_delete=models.SET_NULL, related_name="roles_created", null=True
     )
 
+    class Meta:
+        indexes = [
+            trigram_index("name", "users_role_name_trgm"),
+            trigram_index("description", "users_role_description_trgm"),
+        ]
+
+
+class UserPrincipal(models.Model):
+    """Closure of the groups and roles a user is effectively member of.
+
+    Rows are maintained from membership changes (see ``users.principals``),
+    each one holding either a group or a role.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="principals"
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name="+",
+        blank=True,
+        null=True,
+    )
+    role = models.ForeignKey(
+        Role,
+        on_delete=models.CASCADE,
+        related_name="+",
+        blank=True,
+        null=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(group__isnull=False, role__isnull=True)
+                | models.Q(group__isnull=True, role__isnull=False),
+                name="user_principal_group_or_role",
+            ),
+            models.UniqueConstraint(
+                fields=["user", "group"],
+                condition=models.Q(group__isnull=False),
+                name="unique_user_principal_group",
+            ),
+            models.UniqueConstraint(
+                fields=["user", "role"],
+                condition=models.Q(role__isnull=False),
+                name="unique_user_principal_role",
+            ),
+        ]
+
 
 def generate_custom_background_path(instance, filename, uuid_value=None):
     """Generate path for thumbnail"""
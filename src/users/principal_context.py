@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.utils.functional import cached_property
+
+from users.models import User, UserPrincipal, get_admin_group_id
+from workspaces.models import Workspace
+
+
+class PrincipalContext:
+    """Authorization facts about the user of a request.
+
+    Groups, roles and the admin flag are loaded together with one query
+    on first use, accessible workspaces with another one.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def _principals(self) -> tuple:
+        if not self.user or not self.user.is_authenticated:
+            return frozenset(), frozenset(), False
+        group_ids, role_ids = set(), set()
+        for group_id, role_id in UserPrincipal.objects.filter(
+            user=self.user
+        ).values_list("group_id", "role_id"):
+            if group_id is not None:
+                group_ids.add(group_id)
+            else:
+                role_ids.add(role_id)
+        is_admin_group_member = (
+            settings.SCIM_ENABLED and get_admin_group_id() in group_ids
+        )
+        return frozenset(group_ids), frozenset(role_ids), is_admin_group_member
+
+    @property
+    def group_ids(self) -> frozenset:
+        """Ids of the groups the user is member of."""
+        return self._principals[0]
+
+    @property
+    def role_ids(self) -> frozenset:
+        """Ids of the roles of the user, directly or through groups."""
+        return self._principals[1]
+
+    @property
+    def is_admin(self) -> bool:
+        if not self.user or not self.user.is_authenticated:
+            return False
+        return self.user.system_role == User.SystemRole.ADMIN or (
+            self._principals[2]
+        )
+
+    @property
+    def is_action_manager(self) -> bool:
+        return (
+            self.user.is_authenticated
+            and self.user.system_role == User.SystemRole.ACTION_MANAGER
+        ) or self.is_admin
+
+    @property
+    def is_user_manager(self) -> bool:
+        return (
+            self.user.is_authenticated
+            and self.user.system_role == User.SystemRole.USER_MANAGER
+        ) or self.is_admin
+
+    @cached_property
+    def workspace_ids(self) -> frozenset:
+        """Ids of the workspaces shared with the user."""
+        if not self.user or not self.user.is_authenticated:
+            return frozenset()
+        workspace_ids = Workspace.users.through.objects.filter(
+            user_id=self.user.pk
+        ).values_list("workspace_id")
+        if self.group_ids:
+            workspace_ids = workspace_ids.union(
+                Workspace.groups.through.objects.filter(
+                    group_id__in=self.group_ids
+                ).values_list("workspace_id")
+            )
+        if self.role_ids:
+            workspace_ids = workspace_ids.union(
+                Workspace.roles.through.objects.filter(
+                    role_id__in=self.role_ids
+                ).values_list("workspace_id")
+            )
+        return frozenset(workspace_id for (workspace_id,) in workspace_ids)
+
+
+def get_principal_context(request) -> PrincipalContext:
+    """Return the principal context of a request, built on first use."""
+    user = request.user
+    # DRF requests wrap the Django one, which outlives them.
+    request = getattr(request, "_request", request)
+    context = getattr(request, "principal_context", None)
+    if context is None or context.user is not user:
+        context = PrincipalContext(user)
+        request.principal_context = context
+    return context
@@ -0,0 +1,62 @@
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import CharField, FloatField, Q, Value
+from django.db.models.functions import Greatest
+
+from users.models import Group, Role, User
+
+SEARCHED_FIELDS = {
+    "users": (User, ("username", "email", "first_name", "last_name")),
+    "groups": (Group, ("name",)),
+    "roles": (Role, ("name", "description")),
+}
+
+
+def search_principals(search: str, limit: int) -> dict:
+    """Return the users, groups and roles best matching a search.
+
+    Each word of the search must be contained in one of the searched
+    fields of a principal. Principals of all kinds are ranked together by
+    trigram word similarity with the search, in a single query, and the
+    ``limit`` best ones are returned grouped by kind.
+    """
+    terms = search.split()
+    querysets = [
+        _rank_principals(kind, model, fields, search, terms)
+        for kind, (model, fields) in SEARCHED_FIELDS.items()
+    ]
+    ranked = (
+        querysets[0]
+        .union(*querysets[1:], all=True)
+        .order_by("-rank", "kind", "id")[:limit]
+    )
+
+    ids_by_kind = {kind: [] for kind in SEARCHED_FIELDS}
+    for kind, principal_id, _ in ranked:
+        ids_by_kind[kind].append(principal_id)
+    principals = {}
+    for kind, (model, _) in SEARCHED_FIELDS.items():
+        instances = model.objects.in_bulk(ids_by_kind[kind])
+        principals[kind] = [instances[pk] for pk in ids_by_kind[kind]]
+    return principals
+
+
+def _rank_principals(kind, model, fields, search, terms):
+    matches = Q()
+    for term in terms:
+        term_matches = Q()
+        for field in fields:
+            term_matches |= Q(**{f"{field}__icontains": term})
+        matches &= term_matches
+    similarities = [TrigramWordSimilarity(search, field) for field in fields]
+    return (
+        model.objects.filter(matches)
+        .annotate(
+            kind=Value(kind, output_field=CharField()),
+            rank=(
+                Greatest(*similarities, output_field=FloatField())
+                if len(similarities) > 1
+                else similarities[0]
+            ),
+        )
+        .values_list("kind", "id", "rank")
+    )
@@ -0,0 +1,115 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.dispatch import Signal
+
+from users.models import Role, User, UserPrincipal
+
+# Sent with ``user_ids`` once principals are refreshed (None for all users).
+user_principals_changed = Signal()
+
+
+def refresh_user_principals(user_ids=None) -> int:
+    """Rebuild the principals closure of the given users, or of every user.
+
+    Return the number of closure rows written. The users are locked while
+    their memberships are read and their closure rewritten, so concurrent
+    refreshes of the same users are serialized instead of colliding.
+    """
+    if user_ids is not None:
+        user_ids = set(user_ids)
+        if not user_ids:
+            return 0
+    with transaction.atomic():
+        rows = _rebuild_user_principals(user_ids)
+    user_principals_changed.send(sender=UserPrincipal, user_ids=user_ids)
+    return rows
+
+
+def _rebuild_user_principals(user_ids) -> int:
+    users = User.objects.select_for_update().order_by("pk")
+    user_groups = User.groups.through.objects.all()
+    user_roles = Role.users.through.objects.all()
+    principals = UserPrincipal.objects.all()
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+        user_groups = user_groups.filter(user_id__in=user_ids)
+        user_roles = user_roles.filter(user_id__in=user_ids)
+        principals = principals.filter(user_id__in=user_ids)
+
+    # Lock in a stable order to avoid deadlocks between refreshes.
+    list(users.values_list("pk", flat=True))
+
+    group_ids_by_user = defaultdict(set)
+    for user_id, group_id in user_groups.values_list("user_id", "group_id"):
+        group_ids_by_user[user_id].add(group_id)
+
+    role_ids_by_user = defaultdict(set)
+    for user_id, role_id in user_roles.values_list("user_id", "role_id"):
+        role_ids_by_user[user_id].add(role_id)
+
+    role_ids_by_group = defaultdict(set)
+    group_ids = set().union(*group_ids_by_user.values())
+    if group_ids:
+        for group_id, role_id in Role.groups.through.objects.filter(
+            group_id__in=group_ids
+        ).values_list("group_id", "role_id"):
+            role_ids_by_group[group_id].add(role_id)
+
+    rows = []
+    for user_id, group_ids in group_ids_by_user.items():
+        for group_id in group_ids:
+            rows.append(UserPrincipal(user_id=user_id, group_id=group_id))
+            role_ids_by_user[user_id] |= role_ids_by_group[group_id]
+    for user_id, role_ids in role_ids_by_user.items():
+        for role_id in role_ids:
+            rows.append(UserPrincipal(user_id=user_id, role_id=role_id))
+
+    principals.delete()
+    # Users created meanwhile are not locked, their rows may already exist.
+    UserPrincipal.objects.bulk_create(
+        rows, batch_size=1000, ignore_conflicts=True
+    )
+    return len(rows)
+
+
+def get_group_member_ids(group_ids) -> set:
+    """Return the ids of the users member of any of the given groups."""
+    return set(
+        User.groups.through.objects.filter(group_id__in=group_ids).values_list(
+            "user_id", flat=True
+        )
+    )
+
+
+def get_user_access_filter(model, user) -> Q:
+    """Return a filter matching the rows of ``model`` shared with ``user``.
+
+    ``model`` must define ``users``, ``groups`` and ``roles`` many-to-many
+    fields. Each of them is checked with an ``EXISTS`` semi-join against
+    the principals closure, so no ``DISTINCT`` is needed.
+    """
+    group_ids = UserPrincipal.objects.filter(
+        user=user, group__isnull=False
+    ).values("group_id")
+    role_ids = UserPrincipal.objects.filter(
+        user=user, role__isnull=False
+    ).values("role_id")
+    return (
+        _shared_through(model, "users", user_id=user.pk)
+        | _shared_through(model, "groups", group_id__in=group_ids)
+        | _shared_through(model, "roles", role_id__in=role_ids)
+    )
+
+
+def _shared_through(model, field_name, **lookups) -> Q:
+    field = model._meta.get_field(field_name)
+    through = field.remote_field.through
+    return Q(
+        Exists(
+            through.objects.filter(
+                **{field.m2m_field_name(): OuterRef("pk")}, **lookups
+            )
+        )
+    )
@@ -1,16 +1,22 @@
 from rest_framework import serializers
-from django.conf import settings
 
-from users.models import Group
+from _config.services.eager_loading import (
+    EagerLoadingListSerializer,
+    EagerLoadingMixin,
+)
+from users.models import Group, get_admin_group_id
 from users.serializers.user_serializers import UserSerializer
 
-class GroupSerializer(serializers.ModelSerializer):
+class GroupSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Serializer for Group model."""
 
+    prefetch_related = ("user_set",)
+
     is_admin_group = serializers.SerializerMethodField()
     
     class Meta:
         model = Group
+        list_serializer_class = EagerLoadingListSerializer
         fields = [
             "id",
             "name",
@@ -21,10 +27,8 @@ class GroupSerializer(serializers.ModelSerializer):
 
     def get_is_admin_group(self, group: Group) -> bool:
         """Return True if group is admin group."""
-        admin_group = Group.objects.filter(name=settings.ADMIN_GROUP).first()
-        if not admin_group:
-            return False
-        return group.id == admin_group.id
+        admin_group_id = get_admin_group_id()
+        return admin_group_id is not None and group.id == admin_group_id
     
 
 class GroupDetailedSerializer(GroupSerializer):
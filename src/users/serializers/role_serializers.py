@@ -1,15 +1,22 @@
 from rest_framework import serializers
 
+from _config.services.eager_loading import (
+    EagerLoadingListSerializer,
+    EagerLoadingMixin,
+)
 from .group_serializers import GroupSerializer
 from .user_serializers import UserSerializer
 from users.models import Role
 
 
-class RoleSerializer(serializers.ModelSerializer):
+class RoleSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """Serializer for Role model."""
 
+    prefetch_related = ("users", "groups", "actions")
+
     class Meta:
         model = Role
+        list_serializer_class = EagerLoadingListSerializer
         fields = [
             "id",
             "name",
@@ -1,11 +1,11 @@
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from _config.services.storage_utils import generate_presigned_url
+from _config.services.storage_utils.serializers import PresignedURLMixin
 from users.models import UserPreferences
 
 
-class UserPreferencesSerializer(serializers.ModelSerializer):
+class UserPreferencesSerializer(PresignedURLMixin, serializers.ModelSerializer):
     """Serializer for User Preferences."""
 
     custom_background_image_url = serializers.SerializerMethodField()
@@ -13,9 +13,7 @@ class UserPreferencesSerializer(serializers.ModelSerializer):
     def get_custom_background_image_url(self, obj: UserPreferences) -> str:
         """Return user's custom background image url."""
         if bool(obj.custom_background_image):
-            return generate_presigned_url(
-                obj.custom_background_image.name, self.context["request"]
-            )
+            return self.get_presigned_url(obj.custom_background_image.name)
         return None
 
     class Meta:
@@ -3,6 +3,14 @@ from rest_framework import serializers
 from django.contrib.auth.hashers import make_password
 from rest_framework.exceptions import ValidationError
 from django.conf import settings
+from _config.services.eager_loading import (
+    EagerLoadingListSerializer,
+    EagerLoadingMixin,
+)
+from _config.services.storage_utils.serializers import (
+    PresignedURLListSerializer,
+    PresignedURLMixin,
+)
 from .user_preferences_serializers import UserPreferencesSerializer
 
 from users.models import User
@@ -42,9 +50,20 @@ class ShortUserSerializer(serializers.ModelSerializer):
         ]
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserListSerializer(
+    EagerLoadingListSerializer, PresignedURLListSerializer
+):
+    """List serializer loading users relations and file URLs in bulk."""
+
+
+class UserSerializer(
+    EagerLoadingMixin, PresignedURLMixin, serializers.ModelSerializer
+):
     """Serializer for User model."""
 
+    select_related = ("preferences",)
+    prefetch_related = ("groups",)
+
     profile_picture_url = serializers.SerializerMethodField()
     groups = serializers.SerializerMethodField()
     external_id = serializers.SerializerMethodField()
@@ -54,6 +73,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
+        list_serializer_class = UserListSerializer
         fields = [
             "id",
             "username",
@@ -93,11 +113,17 @@ class UserSerializer(serializers.ModelSerializer):
             )
         return None
 
+    def get_file_keys(self, user: User) -> list:
+        preferences = getattr(user, "preferences", None)
+        if preferences is None or not preferences.custom_background_image:
+            return []
+        return [preferences.custom_background_image.name]
+
     def get_groups(self, user: User) -> list:
         """Return user groups."""
         if not settings.SCIM_ENABLED:
             return []
-        return user.groups.all().values_list("id", flat=True)
+        return [group.pk for group in user.groups.all()]
 
     def validate_password(self, value: str) -> str:
         """Validate password."""
@@ -1,4 +1,6 @@
-from users.models import User
+from users.models import User, UserPrincipal, group_cache
+from users.principals import get_group_member_ids, refresh_user_principals
+from system.collection_versions import bump_collection_versions
 from django.contrib.auth.hashers import make_password
 from django.conf import settings
 
@@ -12,3 +14,99 @@ def create_default_user(sender, **kwargs) -> None:
             password=make_password(settings.ADMIN_PASSWORD),
             system_role=User.SystemRole.ADMIN,
         )
+
+
+def refresh_principals_on_user_groups_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+) -> None:
+    """Refresh principals of users whose groups changed."""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_user_principals([instance.pk])
+        return
+    # The instance is a group and pk_set holds user ids.
+    if action == "pre_clear":
+        instance._cleared_member_ids = get_group_member_ids([instance.pk])
+    elif action == "post_clear":
+        refresh_user_principals(instance._cleared_member_ids)
+    elif action in ("post_add", "post_remove"):
+        refresh_user_principals(pk_set)
+
+
+def refresh_principals_on_role_users_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+) -> None:
+    """Refresh principals of users whose direct roles changed."""
+    if reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_user_principals([instance.pk])
+        return
+    # The instance is a role and pk_set holds user ids.
+    if action == "pre_clear":
+        instance._cleared_member_ids = set(
+            instance.users.values_list("id", flat=True)
+        )
+    elif action == "post_clear":
+        refresh_user_principals(instance._cleared_member_ids)
+    elif action in ("post_add", "post_remove"):
+        refresh_user_principals(pk_set)
+
+
+def refresh_principals_on_role_groups_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+) -> None:
+    """Refresh principals of users whose roles changed through a group."""
+    if reverse:
+        # The instance is a group and pk_set holds role ids.
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_user_principals(get_group_member_ids([instance.pk]))
+        return
+    # The instance is a role and pk_set holds group ids.
+    if action == "pre_clear":
+        instance._cleared_member_ids = get_group_member_ids(
+            instance.groups.values_list("id", flat=True)
+        )
+    elif action == "post_clear":
+        refresh_user_principals(instance._cleared_member_ids)
+    elif action in ("post_add", "post_remove"):
+        refresh_user_principals(get_group_member_ids(pk_set))
+
+
+def capture_principals_on_group_delete(sender, instance, **kwargs) -> None:
+    """Remember the members of a group before it is deleted."""
+    instance._deleted_member_ids = get_group_member_ids([instance.pk])
+
+
+def refresh_principals_on_group_delete(sender, instance, **kwargs) -> None:
+    """Refresh principals of the members of a deleted group."""
+    refresh_user_principals(getattr(instance, "_deleted_member_ids", ()))
+
+
+def capture_principals_on_role_delete(sender, instance, **kwargs) -> None:
+    """Remember the users having a role, directly or through a group, before
+    it is deleted.
+    """
+    instance._deleted_member_ids = set(
+        UserPrincipal.objects.filter(role_id=instance.pk).values_list(
+            "user_id", flat=True
+        )
+    )
+
+
+def refresh_principals_on_role_delete(sender, instance, **kwargs) -> None:
+    """Refresh principals of the users who had a deleted role.
+
+    The deletion cascades to the memberships of the role without sending
+    ``m2m_changed``.
+    """
+    refresh_user_principals(getattr(instance, "_deleted_member_ids", ()))
+
+
+def track_principals_collection(sender, **kwargs) -> None:
+    """Bump the principals collection version once principals changed."""
+    bump_collection_versions("principals")
+
+
+def invalidate_admin_group_on_group_change(sender, **kwargs) -> None:
+    """Forget the cached admin group id when a group is saved or deleted."""
+    group_cache.invalidate("admin-group-id")
@@ -0,0 +1,108 @@
+import pytest
+
+from users.models import Group, Role, User, UserPrincipal
+from users.principals import refresh_user_principals
+
+pytestmark = pytest.mark.django_db
+
+
+def get_principals(user):
+    return set(
+        UserPrincipal.objects.filter(user=user).values_list(
+            "group_id", "role_id"
+        )
+    )
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email="alice@example.com", username="alice", password="password"
+    )
+
+
+@pytest.fixture
+def group():
+    return Group.objects.create(name="group")
+
+
+@pytest.fixture
+def role():
+    return Role.objects.create(name="role")
+
+
+def test_add_and_remove_group(user, group):
+    user.groups.add(group)
+    assert get_principals(user) == {(group.pk, None)}
+
+    user.groups.remove(group)
+    assert get_principals(user) == set()
+
+
+def test_add_user_to_group_from_group_side(user, group):
+    group.user_set.add(user)
+    assert get_principals(user) == {(group.pk, None)}
+
+    group.user_set.clear()
+    assert get_principals(user) == set()
+
+
+def test_grant_and_revoke_role(user, role):
+    role.users.add(user)
+    assert get_principals(user) == {(None, role.pk)}
+
+    user.roles.remove(role)
+    assert get_principals(user) == set()
+
+
+def test_role_granted_through_group(user, group, role):
+    user.groups.add(group)
+    role.groups.add(group)
+    assert get_principals(user) == {(group.pk, None), (None, role.pk)}
+
+    role.groups.remove(group)
+    assert get_principals(user) == {(group.pk, None)}
+
+    group.roles.add(role)
+    user.groups.remove(group)
+    assert get_principals(user) == set()
+
+
+def test_role_granted_directly_and_through_group(user, group, role):
+    role.users.add(user)
+    role.groups.add(group)
+    user.groups.add(group)
+
+    user.groups.remove(group)
+    assert get_principals(user) == {(None, role.pk)}
+
+
+def test_delete_group(user, group, role):
+    user.groups.add(group)
+    role.groups.add(group)
+
+    group.delete()
+    assert get_principals(user) == set()
+
+
+def test_delete_role(user, group, role):
+    role.users.add(user)
+    role.groups.add(group)
+    user.groups.add(group)
+
+    role.delete()
+    assert get_principals(user) == {(group.pk, None)}
+
+
+def test_refresh_is_idempotent(user, group, role):
+    user.groups.add(group)
+    role.groups.add(group)
+
+    assert refresh_user_principals([user.pk]) == 2
+    assert refresh_user_principals([user.pk]) == 2
+    refresh_user_principals()
+    assert get_principals(user) == {(group.pk, None), (None, role.pk)}
+
+
+def test_refresh_no_users():
+    assert refresh_user_principals([]) == 0
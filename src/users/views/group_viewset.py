@@ -1,10 +1,10 @@
 from django.conf import settings
 from rest_framework import viewsets
 from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 
 from _config.permissions import IsReadOnly
+from _config.services.pagination import KeysetPagination
 from users.models import Group
 from users.permissions import IsActionManager, IsUserManager
 from users.serializers.group_serializers import (
@@ -13,7 +13,7 @@ from users.serializers.group_serializers import (
 )
 
 
-class GroupPagination(PageNumberPagination):
+class GroupPagination(KeysetPagination):
     page_size = settings.DEFAULT_PAGE_SIZE
     page_size_query_param = settings.DEFAULT_PAGE_SIZE_QUERY_PARAM
     max_page_size = settings.DEFAULT_MAX_PAGE_SIZE
@@ -6,10 +6,10 @@ from users.permissions import IsUserManager, IsActionManager
 from rest_framework.filters import OrderingFilter, SearchFilter
 from users.models import Role
 from users.serializers.role_serializers import RoleSerializer, RoleDetailedSerializer
-from rest_framework.pagination import PageNumberPagination
+from _config.services.pagination import KeysetPagination
 
 
-class RolePagination(PageNumberPagination):
+class RolePagination(KeysetPagination):
     page_size = settings.DEFAULT_PAGE_SIZE
     page_size_query_param = settings.DEFAULT_PAGE_SIZE_QUERY_PARAM
     max_page_size = settings.DEFAULT_MAX_PAGE_SIZE
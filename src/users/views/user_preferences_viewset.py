@@ -1,18 +1,26 @@
-import mimetypes
 from http import HTTPMethod
 from urllib import response
 
 from django.forms import ValidationError
-from django.http import FileResponse
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from _config.permissions import IsFileAuthenticated, IsOwner
-from _config.services.storage_utils.presigned_url import generate_presigned_url
+from _config.services.image_processing import (
+    create_image_upload,
+    finalize_image_upload,
+    is_raw_image_key,
+    save_image_upload,
+)
+from _config.services.storage_utils import (
+    generate_presigned_url,
+    get_file_response,
+)
 from users.models import UserPreferences
 from users.permissions import IsAdmin
+from users.principal_context import get_principal_context
 from users.serializers.user_preferences_serializers import (
     UserPreferenceCustomBackgroundImageSerializer,
     UserPreferencesSerializer,
@@ -29,7 +37,7 @@ class UserPreferencesViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        if self.request.user.is_admin:
+        if get_principal_context(self.request).is_admin:
             return queryset
         return queryset.filter(user=self.request.user)
 
@@ -65,10 +73,11 @@ class UserPreferencesViewSet(viewsets.ModelViewSet):
                 data=request.data
             )
             serializer.is_valid(raise_exception=True)
-            userPreferences.custom_background_image = serializer.validated_data[
-                "custom_background_image"
-            ]
-            userPreferences.save()
+            save_image_upload(
+                userPreferences,
+                "custom_background_image",
+                serializer.validated_data["custom_background_image"],
+            )
             return Response(
                 {
                     "custom_background_image_url": generate_presigned_url(
@@ -78,6 +87,50 @@ class UserPreferencesViewSet(viewsets.ModelViewSet):
                 }
             )
 
+    @action(
+        detail=True,
+        methods=[HTTPMethod.POST],
+        url_name="background-image-upload",
+        url_path="background-image-upload",
+    )
+    def create_background_image_upload(self, request, pk=None):
+        """Get a URL to upload a background image directly to storage."""
+        max_size_mb = (
+            UserPreferenceCustomBackgroundImageSerializer.PICTURE_MAX_SIZE_MB
+        )
+        return Response(
+            create_image_upload(
+                self.get_object(),
+                "custom_background_image",
+                request.data.get("content_type"),
+                max_size_mb * 1024 * 1024,
+                request,
+            )
+        )
+
+    @action(
+        detail=True,
+        methods=[HTTPMethod.POST],
+        url_name="background-image-upload-finalize",
+        url_path="background-image-upload/finalize",
+    )
+    def finalize_background_image_upload(self, request, pk=None):
+        """Set the background image uploaded to storage."""
+        user_preferences = self.get_object()
+        finalize_image_upload(
+            user_preferences,
+            "custom_background_image",
+            request.data.get("token"),
+        )
+        return Response(
+            {
+                "custom_background_image_url": generate_presigned_url(
+                    user_preferences.custom_background_image.name,
+                    request,
+                )
+            }
+        )
+
     @action(
         detail=True,
         methods=[HTTPMethod.GET],
@@ -88,18 +141,19 @@ class UserPreferencesViewSet(viewsets.ModelViewSet):
     def user_preference_background_file(self, request, pk=None, filename=None):
         """Get user preference background."""
         user_preferences = self.get_object()
+        # Only set when authenticated by a file token.
+        file_key = getattr(request, "file_key", None)
         if (
-            request.file_key
-            and request.file_key
-            != user_preferences.custom_background_image.name
+            file_key
+            and file_key != user_preferences.custom_background_image.name
         ):
             raise ValidationError("Invalid file key provided.")
-        content_type = (
-            mimetypes.guess_type(user_preferences.custom_background_image.name)[
-                0
-            ]
-            or "application/octet-stream"
-        )
-        return FileResponse(
-            user_preferences.custom_background_image, content_type=content_type
+        return get_file_response(
+            request,
+            user_preferences.custom_background_image.name,
+            user_preferences.custom_background_image,
+            immutable=not is_raw_image_key(
+                user_preferences.custom_background_image.name
+            ),
+            image_variants=True,
         )
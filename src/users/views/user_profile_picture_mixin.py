@@ -2,9 +2,16 @@ from http import HTTPMethod
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from users.models import User
 from users.serializers.user_serializers import UserProfilePictureSerializer
-from django.http import HttpResponse
 from django.urls import reverse
+from _config.services.image_processing import (
+    create_image_upload,
+    finalize_image_upload,
+    is_raw_image_key,
+    save_image_upload,
+)
+from _config.services.storage_utils import get_file_response
 
 
 class UserProfilePictureMixin:
@@ -15,11 +22,24 @@ class UserProfilePictureMixin:
         url_path=r"profile/(?P<filename>[\w\-\.]+)",
     )
     def profile_picture(self, request, pk=None, filename=None):
-        """Update user profile picture."""
+        """Get user profile picture."""
         user = self.get_object()
         if not user.profile_picture:
             return Response("No profile picture.", status=status.HTTP_404_NOT_FOUND)
-        return HttpResponse(user.profile_picture, content_type="image/png")
+        # Responses are cached under their URL: only serve the current one.
+        if filename != user.profile_picture.name.split("/")[-1]:
+            return Response(
+                "Unknown profile picture.", status=status.HTTP_404_NOT_FOUND
+            )
+        return get_file_response(
+            request,
+            user.profile_picture.name,
+            user.profile_picture,
+            immutable=not is_raw_image_key(user.profile_picture.name),
+            default_content_type=f"image/{User.PROFILE_FORMAT.lower()}",
+            last_modified=user.last_update,
+            image_variants=True,
+        )
 
     @action(
         detail=True,
@@ -32,8 +52,44 @@ class UserProfilePictureMixin:
         serializer = UserProfilePictureSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = self.get_object()
-        user.profile_picture = serializer.validated_data["profile_picture"]
-        user.save()
+        save_image_upload(
+            user,
+            "profile_picture",
+            serializer.validated_data["profile_picture"],
+        )
+        return self._get_profile_picture_response(request, user)
+
+    @action(
+        detail=True,
+        methods=[HTTPMethod.POST],
+        url_name="profile-upload",
+        url_path="profile-upload",
+    )
+    def create_profile_picture_upload(self, request, pk=None):
+        """Get a URL to upload a profile picture directly to storage."""
+        return Response(
+            create_image_upload(
+                self.get_object(),
+                "profile_picture",
+                request.data.get("content_type"),
+                UserProfilePictureSerializer.PICTURE_MAX_SIZE_MB * 1024 * 1024,
+                request,
+            )
+        )
+
+    @action(
+        detail=True,
+        methods=[HTTPMethod.POST],
+        url_name="profile-upload-finalize",
+        url_path="profile-upload/finalize",
+    )
+    def finalize_profile_picture_upload(self, request, pk=None):
+        """Set the profile picture uploaded to storage."""
+        user = self.get_object()
+        finalize_image_upload(user, "profile_picture", request.data.get("token"))
+        return self._get_profile_picture_response(request, user)
+
+    def _get_profile_picture_response(self, request, user):
         file_name = user.profile_picture.name.split("/")[-1]
         return Response(
             {
@@ -3,12 +3,12 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 
 from _config.permissions import IsOwner, IsReadOnly
+from _config.services.pagination import EstimatedCountPagination
 from users.models import User
 from users.permissions import IsActionManager, IsUserManager
 from users.serializers.user_serializers import UserSerializer
@@ -16,10 +16,11 @@ from users.serializers.user_serializers import UserSerializer
 from .user_profile_picture_mixin import UserProfilePictureMixin
 
 
-class UserPagination(PageNumberPagination):
+class UserPagination(EstimatedCountPagination):
     page_size = 25
     page_size_query_param = "limit"
     max_page_size = 1000
+    count_collections = ("users",)
 
 
 class UserViewSet(viewsets.ModelViewSet, UserProfilePictureMixin):
@@ -43,7 +44,7 @@ class UserViewSet(viewsets.ModelViewSet, UserProfilePictureMixin):
 
     def get_queryset(self):
         queryset = super().get_queryset()
-        return queryset
+        return UserSerializer.setup_eager_loading(queryset)
 
     def get_permissions(self):
         if self.request.method == "OPTIONS":
@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class WorkspacesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "workspaces"
+
+    def ready(self):
+        from system.collection_versions import track_collection
+        from workspaces.models import Workspace
+
+        track_collection(
+            "workspaces",
+            models=[Workspace],
+            through_models=[
+                Workspace.users.through,
+                Workspace.groups.through,
+                Workspace.roles.through,
+            ],
+        )
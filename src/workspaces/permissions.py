@@ -1,6 +1,5 @@
-from .models import Workspace
-from django.db.models import Q
 from rest_framework.permissions import BasePermission
+from users.principal_context import get_principal_context
 
 class IsWorkspaceMember(BasePermission):
     """Custom permission to only allow members of a workspace to view or edit it."""
@@ -11,10 +10,4 @@ class IsWorkspaceMember(BasePermission):
         if not user or not user.is_authenticated:
             return False
 
-        return Workspace.objects.filter(
-            Q(pk=obj.pk),
-            Q(users=user)
-            | Q(groups__user_set=user)
-            | Q(roles__users=user)
-            | Q(roles__groups__user_set=user),
-        ).exists()
+        return obj.pk in get_principal_context(request).workspace_ids
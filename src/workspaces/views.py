@@ -1,22 +1,23 @@
-from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
 from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 
 from _config.permissions import IsReadOnly
+from _config.services.pagination import EstimatedCountPagination
 from system.models import SystemInfo
 from users.permissions import IsActionManager, IsAdmin
+from users.principal_context import get_principal_context
 
 from .models import Workspace
 from .serializers import DetailedWorkspaceSerializer, WorkspaceSerializer
 
 
-class WorkspacePagination(PageNumberPagination):
+class WorkspacePagination(EstimatedCountPagination):
     page_size = 25
     page_size_query_param = "limit"
     max_page_size = 1000
+    count_collections = ("workspaces", "principals")
 
 
 class WorkspaceViewSet(viewsets.ModelViewSet):
@@ -42,7 +43,7 @@ class WorkspaceViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         if not SystemInfo.get_instance().allow_action_workspaces:
             return Workspace.objects.none()
-        if not self.request.user.is_admin:
+        if not get_principal_context(self.request).is_admin:
             return self.get_user_workspaces(Workspace.objects.all())
         return Workspace.objects.all()
 
@@ -59,17 +60,6 @@ class WorkspaceViewSet(viewsets.ModelViewSet):
         return WorkspaceSerializer
 
     def get_user_workspaces(self, queryset):
-        user = self.request.user
-        workspace_ids = (
-            Workspace.objects.filter(
-                Q(users=user)
-                | Q(groups__user_set=user)
-                | Q(roles__users=user)
-                | Q(roles__groups__user_set=user)
-            )
-            .values_list("id", flat=True)
-            .distinct()
-        )
-        return queryset.filter(id__in=workspace_ids).select_related(
-            "created_by"
-        )
+        return queryset.filter(
+            pk__in=get_principal_context(self.request).workspace_ids
+        ).select_related("created_by")